@@ -0,0 +1,39 @@
+"""Token revocation table
+
+Revision ID: 13ff56ac13b7
+Revises: 18eaa8b36aa6
+Create Date: 2026-10-18 11:20:15.806214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '13ff56ac13b7'
+down_revision: Union[str, Sequence[str], None] = '18eaa8b36aa6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "token_revocation",
+        sa.Column("user_id", sa.UUID(as_uuid=True), nullable=False),
+        sa.Column(
+            "revoked_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("token_revocation")
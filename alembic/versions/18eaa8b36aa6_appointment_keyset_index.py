@@ -0,0 +1,30 @@
+"""Appointment keyset pagination index
+
+Revision ID: 18eaa8b36aa6
+Revises: f4f422149a28
+Create Date: 2026-10-18 10:02:47.331950
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '18eaa8b36aa6'
+down_revision: Union[str, Sequence[str], None] = 'f4f422149a28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_appointment_start_time_id", "appointment", ["start_time", "id"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_appointment_start_time_id", table_name="appointment")
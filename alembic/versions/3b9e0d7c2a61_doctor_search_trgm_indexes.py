@@ -0,0 +1,43 @@
+"""Doctor search trigram indexes
+
+Revision ID: 3b9e0d7c2a61
+Revises: f5dd4cbfbd47
+Create Date: 2026-10-18 15:02:37.410218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9e0d7c2a61'
+down_revision: Union[str, Sequence[str], None] = 'f5dd4cbfbd47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRGM_COLUMNS = ("full_name", "phone", "address")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in TRGM_COLUMNS:
+        op.create_index(
+            f"ix_doctor_profile_{column}_trgm",
+            "doctor_profile",
+            [column],
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+    op.create_index(
+        "ix_doctor_profile_department_id_id", "doctor_profile", ["department_id", "id"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_doctor_profile_department_id_id", table_name="doctor_profile")
+    for column in TRGM_COLUMNS:
+        op.drop_index(f"ix_doctor_profile_{column}_trgm", table_name="doctor_profile")
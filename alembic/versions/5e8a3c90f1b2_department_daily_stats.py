@@ -0,0 +1,56 @@
+"""Department daily appointment stats
+
+Revision ID: 5e8a3c90f1b2
+Revises: d27f6b1e4c90
+Create Date: 2026-10-18 17:05:44.218930
+
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e8a3c90f1b2'
+down_revision: Union[str, Sequence[str], None] = 'd27f6b1e4c90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "department_daily_stats",
+        sa.Column("department_id", sa.UUID(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("booked", sa.Integer(), nullable=False),
+        sa.Column("fulfilled", sa.Integer(), nullable=False),
+        sa.Column("cancelled", sa.Integer(), nullable=False),
+        sa.Column("noshow", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["department_id"], ["department.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("department_id", "day"),
+    )
+    # backfill from existing appointments, bucketed like the application does
+    op.execute(
+        sa.text(
+            """
+            INSERT INTO department_daily_stats
+                (department_id, day, booked, fulfilled, cancelled, noshow)
+            SELECT department_id,
+                   (start_time AT TIME ZONE :tz)::date,
+                   count(*) FILTER (WHERE status = 'BOOKED'),
+                   count(*) FILTER (WHERE status = 'FULFILLED'),
+                   count(*) FILTER (WHERE status = 'CANCELLED'),
+                   count(*) FILTER (WHERE status = 'NOSHOW')
+            FROM appointment
+            GROUP BY 1, 2
+            """
+        ).bindparams(tz=os.getenv("STATS_TIMEZONE", "UTC"))
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("department_daily_stats")
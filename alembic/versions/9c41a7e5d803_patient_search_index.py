@@ -0,0 +1,44 @@
+"""Accent-insensitive patient search index
+
+Revision ID: 9c41a7e5d803
+Revises: 3b9e0d7c2a61
+Create Date: 2026-10-18 15:48:51.903364
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c41a7e5d803'
+down_revision: Union[str, Sequence[str], None] = '3b9e0d7c2a61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    # unaccent() is only STABLE, an IMMUTABLE wrapper is needed to index it
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION search_normalize(text) RETURNS text
+        LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+        AS $$ SELECT lower(public.unaccent('public.unaccent'::regdictionary, $1)) $$
+        """
+    )
+    op.execute(
+        """
+        CREATE INDEX ix_patient_profile_search_trgm ON patient_profile
+        USING gin (search_normalize(full_name || ' ' || phone || ' ' || address) gin_trgm_ops)
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_patient_profile_search_trgm", table_name="patient_profile")
+    op.execute("DROP FUNCTION IF EXISTS search_normalize(text)")
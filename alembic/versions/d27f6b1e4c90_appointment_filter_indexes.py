@@ -0,0 +1,58 @@
+"""Composite and partial indexes for filtered appointment listings
+
+Revision ID: d27f6b1e4c90
+Revises: 9c41a7e5d803
+Create Date: 2026-10-18 16:20:13.775042
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd27f6b1e4c90'
+down_revision: Union[str, Sequence[str], None] = '9c41a7e5d803'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# single-column indexes made redundant by the composites leading with the same column
+SUPERSEDED = ("doctor_id", "department_id", "patient_id")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_appointment_doctor_id_start_time_id",
+        "appointment",
+        ["doctor_id", "start_time", "id"],
+    )
+    op.create_index(
+        "ix_appointment_department_id_start_time_id",
+        "appointment",
+        ["department_id", "start_time", "id"],
+    )
+    op.create_index(
+        "ix_appointment_patient_id_start_time_id",
+        "appointment",
+        ["patient_id", sa.text("start_time DESC"), sa.text("id DESC")],
+    )
+    op.create_index(
+        "ix_appointment_booked_start_time_id",
+        "appointment",
+        ["start_time", "id"],
+        postgresql_where=sa.text("status = 'BOOKED'"),
+    )
+    for column in SUPERSEDED:
+        op.execute(f"DROP INDEX IF EXISTS ix_appointment_{column}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in SUPERSEDED:
+        op.create_index(f"ix_appointment_{column}", "appointment", [column])
+    op.drop_index("ix_appointment_booked_start_time_id", table_name="appointment")
+    op.drop_index("ix_appointment_patient_id_start_time_id", table_name="appointment")
+    op.drop_index("ix_appointment_department_id_start_time_id", table_name="appointment")
+    op.drop_index("ix_appointment_doctor_id_start_time_id", table_name="appointment")
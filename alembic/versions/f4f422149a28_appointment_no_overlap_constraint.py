@@ -0,0 +1,40 @@
+"""Appointment no-overlap exclusion constraint
+
+Revision ID: f4f422149a28
+Revises: 85068c08c03f
+Create Date: 2026-10-18 09:12:04.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4f422149a28'
+down_revision: Union[str, Sequence[str], None] = '85068c08c03f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # gist index over a uuid equality needs btree_gist
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.execute(
+        """
+        ALTER TABLE appointment
+        ADD CONSTRAINT appointment_doctor_no_overlap
+        EXCLUDE USING gist (
+            doctor_id WITH =,
+            tstzrange(start_time, end_time, '[)') WITH &&
+        )
+        WHERE (status = 'BOOKED')
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE appointment DROP CONSTRAINT appointment_doctor_no_overlap")
@@ -0,0 +1,33 @@
+"""Catalog version table
+
+Revision ID: f5dd4cbfbd47
+Revises: 13ff56ac13b7
+Create Date: 2026-10-18 12:41:09.122587
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5dd4cbfbd47'
+down_revision: Union[str, Sequence[str], None] = '13ff56ac13b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "catalog_version",
+        sa.Column("name", sa.Text(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("catalog_version")
@@ -0,0 +1,125 @@
+"""
+Per-row CPU cost of building read DTOs from ORM instances vs. column tuples.
+
+    python -m benchmarks.read_path [--rows 100000] [--repeat 5]
+
+Runs against an in-memory SQLite copy of the application's tables, so
+the numbers are mostly Python-side work: result processing, ORM loading and
+DTO validation. Postgres adds network and driver time on top, which is the
+same for both paths.
+"""
+
+import argparse
+import datetime
+import time
+import uuid
+from typing import Callable
+
+from sqlalchemy import Column, MetaData, Table, create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from src.api.v1.appointment.appointment_service import APPOINTMENT_COLUMNS
+from src.api.v1.appointment.dto import AppointmentDto
+from src.api.v1.models.appointment import Appointment, AppointmentStatus
+from src.api.v1.models.auth import PatientProfile
+from src.api.v1.patient.dto import PatientProfileDto
+from src.api.v1.patient.patient_service import PATIENT_COLUMNS
+
+
+def create_table(engine, model) -> None:
+    # bare columns with generic types: indexes, constraints and types like
+    # postgresql.UUID are Postgres-specific
+    table = model.__table__
+    Table(
+        table.name,
+        MetaData(),
+        *(
+            Column(c.name, c.type.as_generic(), primary_key=c.primary_key)
+            for c in table.columns
+        ),
+    ).create(engine)
+
+
+def patient_rows(n: int) -> list[dict]:
+    return [
+        dict(
+            id=uuid.uuid4(),
+            user_id=uuid.uuid4(),
+            full_name=f"Patient {i}",
+            gender="Female",
+            dob=datetime.date(1990, 1, 1),
+            phone=f"09{i:08d}",
+            address="1 Example Street",
+        )
+        for i in range(n)
+    ]
+
+
+def appointment_rows(n: int) -> list[dict]:
+    start = datetime.datetime(2025, 1, 1, 8, tzinfo=datetime.timezone.utc)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return [
+        dict(
+            id=uuid.uuid4(),
+            patient_id=uuid.uuid4(),
+            department_id=uuid.uuid4(),
+            doctor_id=uuid.uuid4(),
+            start_time=start + datetime.timedelta(minutes=30 * i),
+            end_time=start + datetime.timedelta(minutes=30 * i + 30),
+            status=AppointmentStatus.BOOKED,
+            reason="checkup",
+            notes=None,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(n)
+    ]
+
+
+def best_of(repeat: int, engine, read: Callable[[Session], list]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        with Session(engine) as session:
+            started = time.perf_counter()
+            read(session)
+            best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    cases = [
+        (PatientProfile, PatientProfileDto, PATIENT_COLUMNS, patient_rows),
+        (Appointment, AppointmentDto, APPOINTMENT_COLUMNS, appointment_rows),
+    ]
+    print(f"{args.rows} rows, best of {args.repeat}, microseconds per row")
+    print(f"{'dto':<20}{'orm':>10}{'columns':>10}{'speedup':>10}")
+    for model, dto, columns, make_rows in cases:
+        create_table(engine, model)
+        with engine.begin() as conn:
+            conn.execute(insert(model), make_rows(args.rows))
+
+        orm = best_of(
+            args.repeat,
+            engine,
+            lambda s: [dto.model_validate(o) for o in s.scalars(select(model)).all()],
+        )
+        cols = best_of(
+            args.repeat,
+            engine,
+            lambda s: columns.all(s.execute(columns.select()).all()),
+        )
+        per_row = 1e6 / args.rows
+        print(
+            f"{dto.__name__:<20}{orm * per_row:>10.2f}{cols * per_row:>10.2f}"
+            f"{orm / cols:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
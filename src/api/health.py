@@ -0,0 +1,37 @@
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+import logging
+
+from src.config.db import session_manager
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get("/ready")
+async def readiness():
+    """
+    Readiness probe: 200 once the database answers, 503 otherwise.
+    """
+    try:
+        await session_manager.ping()
+    except Exception as e:
+        logger.warning(f"Readiness check failed: {e!r}")
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "unavailable"},
+        )
+    return {"status": "ready", "pool": session_manager.pool_status()}
+
+
+@router.get("/pool")
+async def pool():
+    """
+    Connection pool statistics of this worker.
+    """
+    data = session_manager.pool_status()
+    replica = session_manager.replica_status()
+    if replica is not None:
+        data["replica"] = replica
+    return {"data": data, "status": status.HTTP_200_OK}
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from . import appointment, doctor, patient, department, chatbot, auth
+from . import appointment, doctor, patient, department, chatbot, auth, imports
 
 api_v1_router = APIRouter(prefix="/v1")
 api_v1_router.include_router(appointment.router)
@@ -7,4 +7,5 @@ api_v1_router.include_router(doctor.router)
 api_v1_router.include_router(patient.router)
 api_v1_router.include_router(department.router)
 api_v1_router.include_router(chatbot.router)
-api_v1_router.include_router(auth.router)  # auth routes
\ No newline at end of file
+api_v1_router.include_router(auth.router)  # auth routes
+api_v1_router.include_router(imports.router)
\ No newline at end of file
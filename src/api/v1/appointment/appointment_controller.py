@@ -1,28 +1,84 @@
-from typing import Annotated, List
-from fastapi import APIRouter, Depends, status
+from typing import Annotated, Any, List, Literal, Optional
+from fastapi import APIRouter, Body, Depends, Query, status
+from fastapi.responses import StreamingResponse
 
-from .appointment_service import AppointmentService
-from src.config.db import get_db
+from .appointment_service import BULK_MAX_ITEMS, AppointmentService
+from src.api.v1.models.appointment import AppointmentStatus
+from src.api.v1.response_dto import PaginatedResponseDto, ResponseDto
+from src.api.v1.utils.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
+from src.api.v1.utils.idempotency import IdempotentRoute
+from src.config.db import get_db, get_read_db
 from .dto import *
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
-router = APIRouter(prefix="/appointments", tags=["Appointments"])
+router = APIRouter(
+    prefix="/appointments", tags=["Appointments"], route_class=IdempotentRoute
+)
 
 
-@router.get("", response_model=List[AppointmentDto], status_code=status.HTTP_200_OK)
+@router.get(
+    "",
+    response_model=PaginatedResponseDto[list[AppointmentDto]],
+    status_code=status.HTTP_200_OK,
+)
 async def list_appointments(
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_LIMIT)] = DEFAULT_PAGE_LIMIT,
+    after: Optional[str] = None,
+    doctor_id: Optional[UUID] = None,
+    department_id: Optional[UUID] = None,
+    patient_id: Optional[UUID] = None,
+    status_: Annotated[Optional[AppointmentStatus], Query(alias="status")] = None,
+    start: Annotated[Optional[datetime], Query(alias="from")] = None,
+    end: Annotated[Optional[datetime], Query(alias="to")] = None,
 ):
     """
-    List all appointments.
+    List appointments ordered by start time, one page at a time.
+    Filter by doctor, department, patient, status and a start time range [from, to).
+    Pass the returned `next_cursor` as `after` to fetch the next page.
     """
-    return await AppointmentService.list_appointments(db)
+    page = await AppointmentService.list_appointments(
+        db,
+        limit,
+        after,
+        doctor_id=doctor_id,
+        department_id=department_id,
+        patient_id=patient_id,
+        status_=status_,
+        start=start,
+        end=end,
+    )
+    return {
+        "data": page.items,
+        "next_cursor": page.next_cursor,
+        "status": status.HTTP_200_OK,
+    }
 
 
-@router.post(
-    "", response_model=AppointmentCreateDto, status_code=status.HTTP_201_CREATED
-)
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+@router.get("/export", status_code=status.HTTP_200_OK)
+async def export_appointments(
+    fmt: Annotated[Literal["ndjson", "csv"], Query(alias="format")] = "ndjson",
+    start: Annotated[Optional[datetime], Query(alias="from")] = None,
+    end: Annotated[Optional[datetime], Query(alias="to")] = None,
+):
+    """
+    Export appointments starting within [from, to) as NDJSON or CSV.
+    The body is streamed, so memory use does not grow with the result size.
+    """
+    return StreamingResponse(
+        AppointmentService.export_appointments(fmt, start, end),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="appointments.{fmt}"'
+        },
+    )
+
+
+@router.post("", response_model=AppointmentDto, status_code=status.HTTP_201_CREATED)
 async def create_appointment(
     db: Annotated[AsyncSession, Depends(get_db)],
     appointment_create_dto: AppointmentCreateDto,
@@ -30,11 +86,30 @@ async def create_appointment(
     return await AppointmentService.create_appointment(db, appointment_create_dto)
 
 
+@router.post(
+    ":bulk",
+    response_model=ResponseDto[list[AppointmentBulkResultDto]],
+    status_code=status.HTTP_200_OK,
+)
+async def bulk_create_appointments(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    appointments: Annotated[
+        list[dict[str, Any]], Body(min_length=1, max_length=BULK_MAX_ITEMS)
+    ],
+):
+    """
+    Create many appointments in one transaction.
+    Each item is validated as an AppointmentCreateDto and reported on separately.
+    """
+    data = await AppointmentService.bulk_create_appointments(db, appointments)
+    return {"data": data, "status": status.HTTP_200_OK}
+
+
 @router.get(
     "/{appointment_id}", response_model=AppointmentDto, status_code=status.HTTP_200_OK
 )
 async def get_appointment(
-    db: Annotated[AsyncSession, Depends(get_db)], appointment_id: UUID
+    db: Annotated[AsyncSession, Depends(get_read_db)], appointment_id: UUID
 ):
     return await AppointmentService.get_appointment(db, appointment_id)
 
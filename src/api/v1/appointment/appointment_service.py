@@ -1,27 +1,134 @@
+from datetime import timedelta
+import csv
+import io
+import os
+import uuid
 from fastapi import HTTPException, status
 import logging
 from sqlalchemy.ext.asyncio import AsyncSession
 from .dto import *
-from sqlalchemy import select
+from pydantic import ValidationError
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.api.v1.models.appointment import Appointment
+from typing import Any, AsyncIterator, Literal, Optional
+from src.api.v1.utils.columns import DtoColumns
+from src.api.v1.utils.pagination import DEFAULT_PAGE_LIMIT, Page, keyset, to_page
+from src.api.v1.availability import AvailabilityService, availability_index
+from src.api.v1.department.stats_service import DepartmentStatsService, StatsKey
+from src.api.v1.models.appointment import (
+    APPOINTMENT_NO_OVERLAP_CONSTRAINT,
+    Appointment,
+    AppointmentStatus,
+)
+from src.config.db import session_manager
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_APPOINTMENT_DURATION = timedelta(
+    minutes=int(os.getenv("APPOINTMENT_DURATION_MINUTES", 30))
+)
+
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 1000))
+EXPORT_FIELDS = list(AppointmentDto.model_fields)
+
+# read endpoints build AppointmentDto from these columns, without ORM instances
+APPOINTMENT_COLUMNS = DtoColumns(Appointment, AppointmentDto)
+
+# doctors tried in turn when concurrent bookings take the least booked ones first
+ASSIGNMENT_MAX_ATTEMPTS = int(os.getenv("ASSIGNMENT_MAX_ATTEMPTS", 3))
+
+BULK_INSERT_BATCH_SIZE = int(os.getenv("BULK_INSERT_BATCH_SIZE", 500))
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", 5000))
+
+# SQLSTATE raised by Postgres when an exclusion constraint rejects a row
+EXCLUSION_VIOLATION = "23P01"
+
+
+def _is_slot_conflict(e: IntegrityError) -> bool:
+    return (
+        getattr(e.orig, "sqlstate", None) == EXCLUSION_VIOLATION
+        or APPOINTMENT_NO_OVERLAP_CONSTRAINT in str(e.orig)
+    )
+
+
+def _invalid_slot() -> HTTPException:
+    # caught before Postgres, whose tstzrange rejects it with a DataError
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="end_time must be after start_time.",
+    )
+
 
 class AppointmentService:
     def __init__(self):
         pass
 
     @staticmethod
-    async def list_appointments(db: AsyncSession):
+    async def _slot_taken(
+        db: AsyncSession, doctor_id: UUID, start_time: datetime, end_time: datetime
+    ) -> HTTPException:
+        """
+        Build the 409 returned when the database rejects an overlapping booking,
+        with the doctor's nearest free slots as alternatives.
+        """
+        # the constraint saw a booking this worker's index did not know about
+        availability_index.invalidate("doctor", doctor_id, start_time, end_time)
         try:
-            query = select(Appointment)
+            alternatives = await AvailabilityService.suggest_slots(
+                db, "doctor", doctor_id, start_time, end_time - start_time
+            )
+        except Exception as e:
+            logger.error(f"Error suggesting alternative slots: {str(e)}", exc_info=True)
+            alternatives = []
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": "Slot taken.",
+                "alternatives": [a.model_dump(mode="json") for a in alternatives],
+            },
+        )
+
+    @staticmethod
+    async def list_appointments(
+        db: AsyncSession,
+        limit: int = DEFAULT_PAGE_LIMIT,
+        after: Optional[str] = None,
+        doctor_id: Optional[UUID] = None,
+        department_id: Optional[UUID] = None,
+        patient_id: Optional[UUID] = None,
+        status_: Optional[AppointmentStatus] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Page:
+        """
+        Appointments ordered by (start_time, id), optionally filtered.
+        Each equality filter has a composite index ending in the sort order,
+        so a filtered page is a single index range scan.
+        """
+        try:
+            query = APPOINTMENT_COLUMNS.select()
+            if doctor_id is not None:
+                query = query.where(Appointment.doctor_id == doctor_id)
+            if department_id is not None:
+                query = query.where(Appointment.department_id == department_id)
+            if patient_id is not None:
+                query = query.where(Appointment.patient_id == patient_id)
+            if status_ is not None:
+                query = query.where(Appointment.status == status_)
+            if start is not None:
+                query = query.where(Appointment.start_time >= start)
+            if end is not None:
+                query = query.where(Appointment.start_time < end)
+
+            order_by = (Appointment.start_time, Appointment.id)
+            query = keyset(query, order_by, limit, after)
             result = await db.execute(query)
-            appointments = result.scalars().all()
+            page = to_page(result.all(), order_by, limit)
 
-            return [AppointmentDto.model_validate(a) for a in appointments]
+            return Page(APPOINTMENT_COLUMNS.all(page.items), page.next_cursor)
+        except HTTPException:
+            raise
         except IntegrityError as e:
             logger.error(f"Integrity error while listing appointments: {str(e)}")
             raise HTTPException(
@@ -35,16 +142,79 @@ class AppointmentService:
                 detail="An error occurred while listing appointments.",
             )
 
+    @staticmethod
+    async def export_appointments(
+        fmt: Literal["ndjson", "csv"],
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream appointments through a server-side cursor, one encoded chunk of
+        EXPORT_CHUNK_SIZE rows at a time.
+
+        Opens its own read-only session: the generator outlives the request's dependencies.
+        """
+        query = APPOINTMENT_COLUMNS.select().order_by(
+            Appointment.start_time, Appointment.id
+        )
+        if start is not None:
+            query = query.where(Appointment.start_time >= start)
+        if end is not None:
+            query = query.where(Appointment.start_time < end)
+        query = query.execution_options(yield_per=EXPORT_CHUNK_SIZE)
+
+        if fmt == "csv":
+            yield (",".join(EXPORT_FIELDS) + "\r\n").encode()
+
+        exported = 0
+        try:
+            async with session_manager.read_session() as db:
+                result = await db.stream(query)
+                async for partition in result.partitions(EXPORT_CHUNK_SIZE):
+                    rows = APPOINTMENT_COLUMNS.all(partition)
+                    if fmt == "csv":
+                        buffer = io.StringIO()
+                        writer = csv.writer(buffer)
+                        writer.writerows(
+                            [getattr(r, f) for f in EXPORT_FIELDS] for r in rows
+                        )
+                        yield buffer.getvalue().encode()
+                    else:
+                        yield "".join(r.model_dump_json() + "\n" for r in rows).encode()
+                    exported += len(rows)
+        except Exception as e:
+            # headers are already sent, the client sees a truncated body
+            logger.error(
+                f"Error exporting appointments after {exported} rows: {str(e)}",
+                exc_info=True,
+            )
+            raise
+        logger.info(f"Exported {exported} appointments as {fmt}")
+
     @staticmethod
     async def create_appointment(
         db: AsyncSession, appointment_create_dto: AppointmentCreateDto
     ):
+        data = appointment_create_dto.model_dump()
+        if data.get("end_time") is None:
+            data["end_time"] = data["start_time"] + DEFAULT_APPOINTMENT_DURATION
+        if data["end_time"] <= data["start_time"]:
+            raise _invalid_slot()
         try:
-            appt = Appointment(**appointment_create_dto.model_dump())
+            appt = Appointment(**data)
             db.add(appt)
+            await db.flush()  # one INSERT ... RETURNING created_at, updated_at
+            await DepartmentStatsService.apply(db, DepartmentStatsService.delta([appt]))
             await db.commit()
+            availability_index.apply(appt)
+            return AppointmentDto.model_validate(appt)
         except IntegrityError as e:
             await db.rollback()
+            if _is_slot_conflict(e):
+                logger.info(f"Slot taken for doctor {data['doctor_id']} at {data['start_time']}")
+                raise await AppointmentService._slot_taken(
+                    db, data["doctor_id"], data["start_time"], data["end_time"]
+                )
             logger.error(f"Integrity error while creating appointment: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -58,18 +228,149 @@ class AppointmentService:
                 detail=f"An error occurred while creating the appointment\n{appointment_create_dto.model_dump()}.",
             )
 
+    @staticmethod
+    async def create_assigned_appointment(
+        db: AsyncSession, appointment_create_dto: AppointmentCreateDto
+    ):
+        """
+        Create an appointment with the least booked doctor of its department who
+        is free for the slot. A doctor taken by a concurrent booking in the
+        meantime is skipped for the next one; with nobody free the appointment
+        is left unassigned.
+        """
+        start_time = appointment_create_dto.start_time
+        end_time = appointment_create_dto.end_time or (
+            start_time + DEFAULT_APPOINTMENT_DURATION
+        )
+        if end_time <= start_time:
+            raise _invalid_slot()
+        try:
+            candidates = await AvailabilityService.rank_doctors(
+                db, appointment_create_dto.department_id, start_time, end_time
+            )
+        except Exception as e:
+            logger.error(f"Error ranking doctors: {str(e)}", exc_info=True)
+            candidates = []
+
+        for doctor_id in candidates[:ASSIGNMENT_MAX_ATTEMPTS]:
+            try:
+                return await AppointmentService.create_appointment(
+                    db, appointment_create_dto.model_copy(update={"doctor_id": doctor_id})
+                )
+            except HTTPException as e:
+                if e.status_code != status.HTTP_409_CONFLICT:
+                    raise
+                logger.info(f"Doctor {doctor_id} was booked meanwhile, trying the next one")
+
+        logger.info(
+            f"No free doctor in department {appointment_create_dto.department_id} "
+            f"at {start_time}, booking unassigned"
+        )
+        return await AppointmentService.create_appointment(db, appointment_create_dto)
+
+    @staticmethod
+    async def _insert_rows(db: AsyncSession, rows: list[dict]) -> list:
+        """
+        One multi-row INSERT ... RETURNING, rows returned in input order.
+        """
+        query = insert(Appointment).returning(
+            *(getattr(Appointment, f) for f in AppointmentDto.model_fields),
+            sort_by_parameter_order=True,
+        )
+        result = await db.execute(query, rows)
+        return list(result.all())
+
+    @staticmethod
+    async def bulk_create_appointments(
+        db: AsyncSession, payload: list[dict[str, Any]]
+    ) -> list[AppointmentBulkResultDto]:
+        """
+        Validate and insert many appointments in one transaction.
+
+        Rows go in as batches of BULK_INSERT_BATCH_SIZE, each inside a savepoint.
+        A batch rejected by the database is retried row by row so only the
+        offending items fail.
+        """
+        results: list[Optional[AppointmentBulkResultDto]] = [None] * len(payload)
+        valid: list[tuple[int, dict]] = []
+        for i, raw in enumerate(payload):
+            try:
+                data = AppointmentCreateDto.model_validate(raw).model_dump()
+            except ValidationError as e:
+                results[i] = AppointmentBulkResultDto(index=i, ok=False, error=str(e))
+                continue
+            if data.get("end_time") is None:
+                data["end_time"] = data["start_time"] + DEFAULT_APPOINTMENT_DURATION
+            if data["end_time"] <= data["start_time"]:
+                results[i] = AppointmentBulkResultDto(
+                    index=i, ok=False, error="end_time must be after start_time."
+                )
+                continue
+            data["id"] = uuid.uuid4()
+            valid.append((i, data))
+
+        inserted: list[tuple[int, Any]] = []
+        try:
+            for offset in range(0, len(valid), BULK_INSERT_BATCH_SIZE):
+                batch = valid[offset : offset + BULK_INSERT_BATCH_SIZE]
+                try:
+                    async with db.begin_nested():
+                        rows = await AppointmentService._insert_rows(
+                            db, [data for _, data in batch]
+                        )
+                    inserted += zip((i for i, _ in batch), rows)
+                    continue
+                except IntegrityError:
+                    logger.info(
+                        f"Bulk batch at offset {offset} rejected, retrying row by row"
+                    )
+
+                for i, data in batch:
+                    try:
+                        async with db.begin_nested():
+                            rows = await AppointmentService._insert_rows(db, [data])
+                        inserted.append((i, rows[0]))
+                    except IntegrityError as e:
+                        error = (
+                            "Slot taken."
+                            if _is_slot_conflict(e)
+                            else "Integrity error occurred."
+                        )
+                        results[i] = AppointmentBulkResultDto(
+                            index=i, ok=False, error=error
+                        )
+            await DepartmentStatsService.apply(
+                db, DepartmentStatsService.delta(row for _, row in inserted)
+            )
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error bulk creating appointments: {str(e)}", exc_info=True)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred while bulk creating appointments.",
+            )
+
+        for i, row in inserted:
+            availability_index.apply(row)
+            results[i] = AppointmentBulkResultDto(
+                index=i, ok=True, appointment=AppointmentDto.model_validate(row)
+            )
+        logger.info(f"Bulk created {len(inserted)}/{len(payload)} appointments")
+        return results
+
     @staticmethod
     async def get_appointment(db: AsyncSession, appointment_id: UUID):
         try:
-            query = select(Appointment).where(Appointment.id == appointment_id)
+            query = APPOINTMENT_COLUMNS.select().where(Appointment.id == appointment_id)
             result = await db.execute(query)
-            appt = result.scalars().first()
-            if not appt:
+            row = result.first()
+            if not row:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Appointment not found.",
                 )
-            return AppointmentDto.model_validate(appt)
+            return APPOINTMENT_COLUMNS.one(row)
 
         except HTTPException:
             logger.error(f"Appointment with id {appointment_id} not found.")
@@ -91,26 +392,86 @@ class AppointmentService:
     async def update_appointment(
         db: AsyncSession, appointment_id: UUID, update_data: AppointmentUpdateDto
     ):
+        values = {
+            key: value
+            for key, value in update_data.model_dump().items()
+            if value is not None
+        }
+        if "start_time" in values and "end_time" in values:
+            if values["end_time"] <= values["start_time"]:
+                raise _invalid_slot()
         try:
-            query = select(Appointment).where(Appointment.id == appointment_id)
-            result = await db.execute(query)
-            appt = result.scalars().first()
-            if not appt:
+            # one UPDATE ... RETURNING, an empty result means the row does not exist;
+            # the locked pre-update row comes back too, for the department stats
+            if values:
+                old = (
+                    select(
+                        Appointment.id,
+                        Appointment.department_id,
+                        Appointment.start_time,
+                        Appointment.end_time,
+                        Appointment.status,
+                    )
+                    .where(Appointment.id == appointment_id)
+                    .with_for_update()
+                    .subquery("old")
+                )
+                query = (
+                    update(Appointment)
+                    .where(Appointment.id == old.c.id)
+                    .values(**values)
+                    .returning(
+                        Appointment, old.c.department_id, old.c.start_time, old.c.status
+                    )
+                )
+                # moving one bound must keep it on the right side of the stored other
+                if "end_time" not in values and "start_time" in values:
+                    query = query.where(old.c.end_time > values["start_time"])
+                elif "start_time" not in values and "end_time" in values:
+                    query = query.where(old.c.start_time < values["end_time"])
+            else:
+                query = select(Appointment).where(Appointment.id == appointment_id)
+            row = (await db.execute(query)).first()
+            if not row:
+                if ("start_time" in values or "end_time" in values) and await db.scalar(
+                    select(Appointment.id).where(Appointment.id == appointment_id)
+                ):
+                    raise _invalid_slot()
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail=f"Appointment {appointment_id} not found.",
                 )
-            for key, value in update_data.model_dump().items():
-                if value is not None:
-                    setattr(appt, key, value)
+            appt = row[0]
+            if values:
+                deltas = DepartmentStatsService.delta([StatsKey(*row[1:])], sign=-1)
+                DepartmentStatsService.delta([appt], into=deltas)
+                await DepartmentStatsService.apply(db, deltas)
             await db.commit()
-            await db.refresh(appt)
+            availability_index.apply(appt)
             return AppointmentDto.model_validate(appt)
-        except HTTPException:
-            logger.error(f"Appointment with id {appointment_id} not found.")
+        except HTTPException as e:
+            if e.status_code == status.HTTP_404_NOT_FOUND:
+                logger.error(f"Appointment with id {appointment_id} not found.")
             raise
         except IntegrityError as e:
             await db.rollback()
+            if _is_slot_conflict(e):
+                logger.info(f"Slot taken while updating appointment {appointment_id}")
+                # the statement never returned a row, rebuild the requested slot
+                current = await db.execute(
+                    select(
+                        Appointment.doctor_id,
+                        Appointment.start_time,
+                        Appointment.end_time,
+                    ).where(Appointment.id == appointment_id)
+                )
+                requested = {**current.one()._asdict(), **values}
+                raise await AppointmentService._slot_taken(
+                    db,
+                    requested["doctor_id"],
+                    requested["start_time"],
+                    requested["end_time"],
+                )
             logger.error(f"Integrity error while updating appointment: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -127,16 +488,24 @@ class AppointmentService:
     @staticmethod
     async def delete_appointment(db: AsyncSession, appointment_id: UUID):
         try:
-            query = select(Appointment).where(Appointment.id == appointment_id)
-            result = await db.execute(query)
-            appt = result.scalars().first()
-            if not appt:
+            result = await db.execute(
+                delete(Appointment)
+                .where(Appointment.id == appointment_id)
+                .returning(
+                    Appointment.department_id, Appointment.start_time, Appointment.status
+                )
+            )
+            deleted = result.first()
+            if deleted is None:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail=f"Appointment {appointment_id} not found.",
                 )
-            await db.delete(appt)
+            await DepartmentStatsService.apply(
+                db, DepartmentStatsService.delta([deleted], sign=-1)
+            )
             await db.commit()
+            availability_index.discard(appointment_id)
         except HTTPException:
             logger.error(f"Appointment with id {appointment_id} not found.")
             raise
@@ -21,8 +21,8 @@ class AppointmentCreateDto(BaseModel):
     department_id: UUID
     doctor_id: Optional[UUID] = None
     start_time: datetime
-    # end_time: datetime
-    status: Optional[str] = "scheduled"
+    end_time: Optional[datetime] = None
+    status: Optional[str] = "booked"
     notes: Optional[str] = None
 
 class AppointmentUpdateDto(BaseModel):
@@ -32,4 +32,11 @@ class AppointmentUpdateDto(BaseModel):
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
     status: Optional[str] = None
-    notes: Optional[str] = None
\ No newline at end of file
+    notes: Optional[str] = None
+
+
+class AppointmentBulkResultDto(BaseModel):
+    index: int
+    ok: bool
+    appointment: Optional[AppointmentDto] = None
+    error: Optional[str] = None
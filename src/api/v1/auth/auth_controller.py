@@ -14,6 +14,7 @@ from src.api.v1.utils.security import (
     verify_password,
     ACCESS_TOKEN_EXPIRE_MINUTES,
     create_access_token,
+    token_denylist,
 )
 
 from ....config.db import get_db
@@ -86,7 +87,7 @@ async def login_username_password(
     state: Optional[str] = Form(None),
 ):
     user = await AuthService.get_user_by_username(db, username=username)
-    if not user or not verify_password(password, user.hashed_password):
+    if not user or not await verify_password(password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials"
         )
@@ -132,6 +133,19 @@ async def get_me(
         return {"data": patient_profile_response, "status": status.HTTP_200_OK}
 
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[UserDto, Depends(get_current_user)],
+):
+    """
+    Revoke every access token issued to the current user.
+    Other workers pick the revocation up on their next denylist refresh.
+    """
+    revoked_at = await AuthService.revoke_tokens(db, current_user.id)
+    token_denylist.revoke(current_user.id, revoked_at)
+
+
 @router.post("/token", response_model=TokenDto)
 async def exchange_code_for_token(
     db: Annotated[AsyncSession, Depends(get_db)],
@@ -3,11 +3,12 @@ import math
 import random
 import uuid
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.v1.models.department import Department
 from src.api.v1.utils.security import get_password_hash
-from ..models.auth import User, PatientProfile, DoctorProfile, Role
+from ..models.auth import User, PatientProfile, DoctorProfile, Role, TokenRevocation
 
 
 class AuthService:
@@ -34,6 +35,25 @@ class AuthService:
             print(f"Error fetching patient profile: {e}")
             raise
 
+    @staticmethod
+    async def revoke_tokens(db: AsyncSession, user_id: uuid.UUID) -> datetime.datetime:
+        """
+        Invalidate every access token issued to the user so far.
+        """
+        # whole seconds, like the `iat` claim: a token issued later in the same
+        # second as the logout must stay valid
+        revoked_at = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+        await db.execute(
+            insert(TokenRevocation)
+            .values(user_id=user_id, revoked_at=revoked_at)
+            .on_conflict_do_update(
+                index_elements=[TokenRevocation.user_id],
+                set_={"revoked_at": revoked_at},
+            )
+        )
+        await db.commit()
+        return revoked_at
+
     @staticmethod
     async def create_account(
         db: AsyncSession, username: str, password: str, role: Role
@@ -43,7 +63,9 @@ class AuthService:
             raise ValueError("Username already exists")
 
         new_user = User(
-            username=username, hashed_password=get_password_hash(password), role=role
+            username=username,
+            hashed_password=await get_password_hash(password),
+            role=role,
         )
         db.add(new_user)
 
@@ -0,0 +1,5 @@
+from .availability_service import (
+    AvailabilityService,
+    availability_index,
+    department_roster,
+)
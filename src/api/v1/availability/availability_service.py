@@ -0,0 +1,425 @@
+import bisect
+import heapq
+import logging
+import os
+import time
+from collections import Counter
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import Iterable, Literal, NamedTuple, Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.v1.models.appointment import Appointment, AppointmentStatus
+from src.api.v1.models.auth import DoctorProfile
+from .dto import *
+
+logger = logging.getLogger(__name__)
+
+AVAILABILITY_CACHE_TTL_SECONDS = float(os.getenv("AVAILABILITY_CACHE_TTL_SECONDS", 60))
+AVAILABILITY_MAX_WINDOW_DAYS = int(os.getenv("AVAILABILITY_MAX_WINDOW_DAYS", 31))
+
+Scope = Literal["doctor", "department"]
+
+
+class Booking(NamedTuple):
+    """
+    The subset of an appointment the availability index cares about.
+    Any object exposing these attributes (ORM instance, result row) can be applied.
+    """
+
+    id: UUID
+    doctor_id: Optional[UUID]
+    department_id: UUID
+    start_time: datetime
+    end_time: datetime
+    status: str
+
+    @classmethod
+    def of(cls, appt) -> "Booking":
+        return cls(
+            appt.id,
+            appt.doctor_id,
+            appt.department_id,
+            appt.start_time,
+            appt.end_time,
+            appt.status,
+        )
+
+
+class _Day:
+    __slots__ = ("loaded_at", "intervals")
+
+    def __init__(self, intervals: list[tuple[datetime, datetime, UUID]]):
+        self.loaded_at = time.monotonic()
+        self.intervals = sorted(intervals)  # (start, end, appointment_id)
+
+
+_Key = tuple[str, UUID, date]
+
+
+def _utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _day_bounds(day: date) -> tuple[datetime, datetime]:
+    start = datetime.combine(day, dt_time.min, tzinfo=timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+def _days_between(start: datetime, end: datetime) -> list[date]:
+    """UTC days touched by the half-open range [start, end)."""
+    first = _utc(start).date()
+    last = _utc(end - timedelta(microseconds=1)).date() if end > start else first
+    return [first + timedelta(days=i) for i in range((last - first).days + 1)]
+
+
+def merge_free(
+    booked: Iterable[tuple[datetime, datetime]], start: datetime, end: datetime
+) -> list[tuple[datetime, datetime]]:
+    """
+    Complement of the booked intervals within [start, end).
+
+    Args:
+        booked: intervals sorted by start time, may overlap.
+    """
+    free = []
+    cursor = start
+    for b_start, b_end in booked:
+        if b_end <= cursor:
+            continue
+        if b_start >= end:
+            break
+        if b_start > cursor:
+            free.append((cursor, b_start))
+        cursor = max(cursor, b_end)
+        if cursor >= end:
+            break
+    if cursor < end:
+        free.append((cursor, end))
+    return free
+
+
+class AvailabilityIndex:
+    """
+    Per-worker interval index of BOOKED appointments, keyed by (scope, owner, UTC day).
+
+    Days are loaded lazily from the database on first use and kept up to date
+    in place by the appointment write paths; the TTL bounds staleness caused by
+    writes from other workers.
+    """
+
+    def __init__(self, ttl_seconds: float = AVAILABILITY_CACHE_TTL_SECONDS):
+        self._ttl = ttl_seconds
+        self._days: dict[_Key, _Day] = {}
+        self._entries: dict[UUID, Booking] = {}
+        # writes that raced an in-flight load must keep that load out of the cache
+        self._loading: Counter[_Key] = Counter()
+        self._touched: dict[_Key, int] = {}
+        self._clock = 0
+
+    @staticmethod
+    def _keys(booking: Booking) -> list[_Key]:
+        days = _days_between(booking.start_time, booking.end_time)
+        keys: list[_Key] = [("department", booking.department_id, d) for d in days]
+        if booking.doctor_id is not None:
+            keys += [("doctor", booking.doctor_id, d) for d in days]
+        return keys
+
+    def _remove(self, appointment_id: UUID) -> None:
+        old = self._entries.pop(appointment_id, None)
+        if old is None:
+            return
+        item = (_utc(old.start_time), _utc(old.end_time), old.id)
+        for key in self._keys(old):
+            day = self._days.get(key)
+            if day is None:
+                continue
+            i = bisect.bisect_left(day.intervals, item)
+            if i < len(day.intervals) and day.intervals[i] == item:
+                del day.intervals[i]
+
+    def _touch(self, keys: Iterable[_Key]) -> None:
+        self._clock += 1
+        for key in keys:
+            if self._loading[key]:
+                self._touched[key] = self._clock
+
+    def apply(self, appt) -> None:
+        """
+        Reflect a committed insert or update of an appointment.
+        """
+        booking = Booking.of(appt)
+        old = self._entries.get(booking.id)
+        self._remove(booking.id)
+        keys = self._keys(booking)
+        self._touch(keys + (self._keys(old) if old else []))
+        if booking.status != AppointmentStatus.BOOKED:
+            return
+
+        item = (_utc(booking.start_time), _utc(booking.end_time), booking.id)
+        for key in keys:
+            day = self._days.get(key)
+            if day is not None:
+                bisect.insort(day.intervals, item)
+                self._entries[booking.id] = booking
+
+    def discard(self, appointment_id: UUID) -> None:
+        """
+        Reflect a committed delete of an appointment.
+        """
+        old = self._entries.get(appointment_id)
+        if old is not None:
+            self._touch(self._keys(old))
+        self._remove(appointment_id)
+
+    def invalidate(self, scope: Scope, owner_id: UUID, start: datetime, end: datetime) -> None:
+        """
+        Drop cached days so the next read reloads them, e.g. after the database
+        rejected a booking this worker believed was free.
+        """
+        for d in _days_between(start, end):
+            self._days.pop((scope, owner_id, d), None)
+
+    def _evict_expired(self, now: float) -> None:
+        expired = [k for k, d in self._days.items() if now - d.loaded_at > self._ttl]
+        for key in expired:
+            del self._days[key]
+        if expired:
+            self._entries = {
+                appt_id: b
+                for appt_id, b in self._entries.items()
+                if any(k in self._days for k in self._keys(b))
+            }
+
+    async def _load_days(
+        self, db: AsyncSession, scope: Scope, owner_ids: list[UUID], days: list[date]
+    ) -> dict[_Key, _Day]:
+        """
+        Load the given days of several owners in one query.
+        """
+        keys = [(scope, owner_id, d) for owner_id in owner_ids for d in days]
+        range_start = _day_bounds(min(days))[0]
+        range_end = _day_bounds(max(days))[1]
+        column = Appointment.doctor_id if scope == "doctor" else Appointment.department_id
+        query = select(
+            Appointment.id,
+            Appointment.doctor_id,
+            Appointment.department_id,
+            Appointment.start_time,
+            Appointment.end_time,
+            Appointment.status,
+        ).where(
+            column.in_(owner_ids),
+            Appointment.status == AppointmentStatus.BOOKED,
+            Appointment.start_time < range_end,
+            Appointment.end_time > range_start,
+        )
+
+        started = self._clock
+        for key in keys:
+            self._loading[key] += 1
+        try:
+            result = await db.execute(query)
+            rows = [Booking.of(r) for r in result.all()]
+        finally:
+            for key in keys:
+                self._loading[key] -= 1
+                if not self._loading[key]:
+                    del self._loading[key]
+
+        buckets: dict[_Key, list[Booking]] = {key: [] for key in keys}
+        for b in rows:
+            owner_id = b.doctor_id if scope == "doctor" else b.department_id
+            for d in _days_between(b.start_time, b.end_time):
+                bucket = buckets.get((scope, owner_id, d))
+                if bucket is not None:
+                    bucket.append(b)
+
+        self._evict_expired(time.monotonic())
+        loaded = {}
+        for key, bookings in buckets.items():
+            raced = self._touched.get(key, -1) > started
+            if key not in self._loading:
+                self._touched.pop(key, None)
+
+            loaded[key] = _Day(
+                [(_utc(b.start_time), _utc(b.end_time), b.id) for b in bookings]
+            )
+            if raced:
+                logger.debug(f"Availability load for {key} raced a write, not caching")
+                continue
+            self._days[key] = loaded[key]
+            for b in bookings:
+                self._entries[b.id] = b
+        return loaded
+
+    async def days(
+        self, db: AsyncSession, scope: Scope, owner_ids: list[UUID], days: list[date]
+    ) -> dict[_Key, _Day]:
+        """
+        The given days of several owners, loading missing or expired ones together.
+        """
+        now = time.monotonic()
+        found: dict[_Key, _Day] = {}
+        stale: list[UUID] = []
+        for owner_id in owner_ids:
+            for d in days:
+                day = self._days.get((scope, owner_id, d))
+                if day is None or now - day.loaded_at > self._ttl:
+                    stale.append(owner_id)
+                    break
+                found[(scope, owner_id, d)] = day
+        if stale:
+            found.update(await self._load_days(db, scope, stale, days))
+        return found
+
+    async def free_intervals(
+        self,
+        db: AsyncSession,
+        scope: Scope,
+        owner_id: UUID,
+        start: datetime,
+        end: datetime,
+    ) -> list[tuple[datetime, datetime]]:
+        """
+        Merged free intervals for the owner within [start, end).
+        """
+        start, end = _utc(start), _utc(end)
+        days = _days_between(start, end)
+        loaded = await self.days(db, scope, [owner_id], days)
+        per_day = [
+            [(s, e) for s, e, _ in loaded[(scope, owner_id, d)].intervals] for d in days
+        ]
+        return merge_free(heapq.merge(*per_day), start, end)
+
+
+availability_index = AvailabilityIndex()
+
+
+class DepartmentRoster:
+    """
+    Per-worker cache of the doctor ids of each department, reloaded after the
+    same TTL as the availability index. Doctor writes on this worker clear it.
+    """
+
+    def __init__(self, ttl_seconds: float = AVAILABILITY_CACHE_TTL_SECONDS):
+        self._ttl = ttl_seconds
+        self._doctors: dict[UUID, tuple[float, list[UUID]]] = {}
+
+    async def doctor_ids(self, db: AsyncSession, department_id: UUID) -> list[UUID]:
+        now = time.monotonic()
+        cached = self._doctors.get(department_id)
+        if cached is not None and now - cached[0] <= self._ttl:
+            return cached[1]
+        result = await db.execute(
+            select(DoctorProfile.id)
+            .where(DoctorProfile.department_id == department_id)
+            .order_by(DoctorProfile.id)
+        )
+        doctor_ids = list(result.scalars().all())
+        self._doctors[department_id] = (now, doctor_ids)
+        return doctor_ids
+
+    def invalidate(self) -> None:
+        self._doctors.clear()
+
+
+department_roster = DepartmentRoster()
+
+
+def _overlaps(
+    intervals: list[tuple[datetime, datetime, UUID]], start: datetime, end: datetime
+) -> bool:
+    # a doctor's BOOKED intervals never overlap, so sorted by start they are
+    # sorted by end too and only the last one starting before `end` can reach `start`
+    i = bisect.bisect_left(intervals, (end,))
+    return i > 0 and intervals[i - 1][1] > start
+
+ALTERNATIVE_SLOTS_LIMIT = 3
+
+
+class AvailabilityService:
+    @staticmethod
+    async def suggest_slots(
+        db: AsyncSession,
+        scope: Scope,
+        owner_id: UUID,
+        start: datetime,
+        duration: timedelta,
+        limit: int = ALTERNATIVE_SLOTS_LIMIT,
+    ) -> list[TimeIntervalDto]:
+        """
+        Earliest free slots of the given duration within a day of the requested start.
+        """
+        free = await availability_index.free_intervals(
+            db, scope, owner_id, start, start + timedelta(days=1)
+        )
+        slots = []
+        for s, e in free:
+            while s + duration <= e and len(slots) < limit:
+                slots.append(TimeIntervalDto(start=s, end=s + duration))
+                s += duration
+        return slots
+
+    @staticmethod
+    async def rank_doctors(
+        db: AsyncSession, department_id: UUID, start: datetime, end: datetime
+    ) -> list[UUID]:
+        """
+        Doctors of the department free for [start, end), fewest bookings on the
+        day of `start` first. Loads come from the index's in-memory days, so a
+        warm ranking runs no query at all.
+        """
+        start, end = _utc(start), _utc(end)
+        doctor_ids = await department_roster.doctor_ids(db, department_id)
+        if not doctor_ids:
+            return []
+        days = _days_between(start, end)
+        loaded = await availability_index.days(db, "doctor", doctor_ids, days)
+
+        ranked = []
+        for doctor_id in doctor_ids:
+            per_day = [loaded[("doctor", doctor_id, d)].intervals for d in days]
+            if any(_overlaps(intervals, start, end) for intervals in per_day):
+                continue
+            ranked.append((len(per_day[0]), doctor_id))
+        ranked.sort()
+        return [doctor_id for _, doctor_id in ranked]
+
+    @staticmethod
+    async def get_availability(
+        db: AsyncSession, scope: Scope, owner_id: UUID, start: datetime, end: datetime
+    ):
+        # naive bounds are UTC; comparing one with an aware bound would raise
+        start, end = _utc(start), _utc(end)
+        if end <= start:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="'to' must be after 'from'.",
+            )
+        if end - start > timedelta(days=AVAILABILITY_MAX_WINDOW_DAYS):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Availability window cannot exceed {AVAILABILITY_MAX_WINDOW_DAYS} days.",
+            )
+        try:
+            free = await availability_index.free_intervals(
+                db, scope, owner_id, start, end
+            )
+            return AvailabilityDto(
+                owner_id=owner_id,
+                start=start,
+                end=end,
+                free=[TimeIntervalDto(start=s, end=e) for s, e in free],
+            )
+        except Exception as e:
+            logger.error(f"Error computing {scope} availability: {str(e)}", exc_info=True)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred while computing availability.",
+            )
@@ -0,0 +1,15 @@
+from uuid import UUID
+from pydantic import BaseModel
+from datetime import datetime
+
+
+class TimeIntervalDto(BaseModel):
+    start: datetime
+    end: datetime
+
+
+class AvailabilityDto(BaseModel):
+    owner_id: UUID
+    start: datetime
+    end: datetime
+    free: list[TimeIntervalDto]
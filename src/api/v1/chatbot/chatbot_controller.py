@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta
-from typing import Annotated
-from fastapi import APIRouter, Depends, status
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.v1.appointment.appointment_service import AppointmentService
@@ -8,11 +8,21 @@ from src.api.v1.appointment.dto.dto import AppointmentCreateDto
 from src.api.v1.auth.dto.auth_dto import UserDto
 from src.api.v1.chatbot.dto.dto import ChatbotAppointmentCreateDto
 from src.api.v1.department.department_service import DepartmentService
+from src.api.v1.department.dto import DepartmentDto
+from src.api.v1.response_dto import PaginatedResponseDto
+from src.api.v1.utils.catalog import (
+    DEPARTMENT_CATALOG,
+    cache_headers,
+    catalog_versions,
+    etag_matches,
+)
+from src.api.v1.utils.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
 from src.api.v1.utils.security import get_current_user
+from src.api.v1.utils.idempotency import IdempotentRoute
 from ....config.db import get_db
 
 
-router = APIRouter(prefix="/chatbot", tags=["Chatbot"])
+router = APIRouter(prefix="/chatbot", tags=["Chatbot"], route_class=IdempotentRoute)
 
 
 @router.post("/appointment")
@@ -22,7 +32,8 @@ async def create_appointment_via_chatbot(
     payload: ChatbotAppointmentCreateDto,
 ):
     """
-    Create a new appointment from a chatbot's request.
+    Create a new appointment from a chatbot's request, assigned to the least
+    booked doctor of the department who is free at that time.
     """
     try:
         appointment_data = AppointmentCreateDto(
@@ -38,14 +49,31 @@ async def create_appointment_via_chatbot(
             "message": "Invalid date format. Please use ISO 8601 format.",
         }
 
-    return await AppointmentService.create_appointment(db, appointment_data)
+    return await AppointmentService.create_assigned_appointment(db, appointment_data)
 
-@router.get("/departments")
+@router.get("/departments", response_model=PaginatedResponseDto[list[DepartmentDto]])
 async def list_departments(
+    request: Request,
+    response: Response,
     db: Annotated[AsyncSession, Depends(get_db)],
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_LIMIT)] = DEFAULT_PAGE_LIMIT,
+    after: Optional[str] = None,
 ):
     """
-    List all departments.
+    List departments, one page at a time.
+    Supports conditional GET via ETag / If-None-Match.
     """
-    data = await DepartmentService.list_departments(db)
-    return {"data": data, "status": status.HTTP_200_OK}
\ No newline at end of file
+    etag = catalog_versions.etag(DEPARTMENT_CATALOG)
+    if etag:
+        if etag_matches(request, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag)
+            )
+        response.headers.update(cache_headers(etag))
+
+    page = await DepartmentService.list_departments(db, limit, after)
+    return {
+        "data": page.items,
+        "next_cursor": page.next_cursor,
+        "status": status.HTTP_200_OK,
+    }
\ No newline at end of file
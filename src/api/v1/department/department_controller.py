@@ -1,20 +1,64 @@
-from typing import Annotated
-from fastapi import APIRouter, Depends, status
-from src.config.db import get_db
+from datetime import date, datetime
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from src.api.v1.availability import AvailabilityService
+from src.api.v1.availability.dto import AvailabilityDto
+from src.api.v1.response_dto import PaginatedResponseDto, ResponseDto
+from src.api.v1.utils.catalog import (
+    DEPARTMENT_CATALOG,
+    cache_headers,
+    catalog_versions,
+    etag_matches,
+)
+from src.api.v1.utils.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
+from src.api.v1.utils.idempotency import IdempotentRoute
+from src.config.db import get_db, get_read_db
 from .dto import *
 from sqlalchemy.ext.asyncio import AsyncSession
 from .department_service import DepartmentService
+from .stats_service import DepartmentStatsService
 
-router = APIRouter(prefix="/departments", tags=["Departments"])
+router = APIRouter(
+    prefix="/departments", tags=["Departments"], route_class=IdempotentRoute
+)
 
 
-@router.get("", response_model=dict, status_code=status.HTTP_200_OK)
-async def list_departments(db: Annotated[AsyncSession, Depends(get_db)]):
-    data = await DepartmentService.list_departments(db)
-    return {"data": data, "status": status.HTTP_200_OK}
+@router.get(
+    "",
+    response_model=PaginatedResponseDto[list[DepartmentDto]],
+    status_code=status.HTTP_200_OK,
+)
+async def list_departments(
+    request: Request,
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_LIMIT)] = DEFAULT_PAGE_LIMIT,
+    after: Optional[str] = None,
+):
+    """
+    List departments. Supports conditional GET via ETag / If-None-Match.
+    Stays on the primary: a lagging replica would pair a new ETag with stale data.
+    """
+    # read the version before the query so a concurrent write can only make the tag older
+    etag = catalog_versions.etag(DEPARTMENT_CATALOG)
+    if etag:
+        if etag_matches(request, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag)
+            )
+        response.headers.update(cache_headers(etag))
 
+    page = await DepartmentService.list_departments(db, limit, after)
+    return {
+        "data": page.items,
+        "next_cursor": page.next_cursor,
+        "status": status.HTTP_200_OK,
+    }
 
-@router.post("", response_model=dict, status_code=status.HTTP_201_CREATED)
+
+@router.post(
+    "", response_model=ResponseDto[DepartmentDto], status_code=status.HTTP_201_CREATED
+)
 async def create_department(
     db: Annotated[AsyncSession, Depends(get_db)], department_data: DepartmentCreateDto
 ):
@@ -22,15 +66,75 @@ async def create_department(
     return {"data": data, "status": status.HTTP_201_CREATED}
 
 
-@router.get("/{department_id}", response_model=dict, status_code=status.HTTP_200_OK)
+@router.get(
+    "/{department_id}",
+    response_model=ResponseDto[DepartmentDto],
+    status_code=status.HTTP_200_OK,
+)
 async def get_department_by_id(
-    db: Annotated[AsyncSession, Depends(get_db)], department_id: UUID
+    request: Request,
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    department_id: UUID,
 ):
+    # the tag covers the whole catalog: validate it only once the department
+    # is known to exist, a missing one must stay a 404
+    etag = catalog_versions.etag(DEPARTMENT_CATALOG)
     data = await DepartmentService.get_department_by_id(db, department_id)
+    if etag:
+        if etag_matches(request, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag)
+            )
+        response.headers.update(cache_headers(etag))
+
+    return {"data": data, "status": status.HTTP_200_OK}
+
+
+@router.get(
+    "/{department_id}/availability",
+    response_model=ResponseDto[AvailabilityDto],
+    status_code=status.HTTP_200_OK,
+)
+async def get_department_availability(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    department_id: UUID,
+    start: Annotated[datetime, Query(alias="from")],
+    end: Annotated[datetime, Query(alias="to")],
+):
+    """
+    Free time intervals of a department within [from, to).
+    """
+    data = await AvailabilityService.get_availability(
+        db, "department", department_id, start, end
+    )
+    return {"data": data, "status": status.HTTP_200_OK}
+
+
+@router.get(
+    "/{department_id}/stats",
+    response_model=ResponseDto[DepartmentStatsDto],
+    status_code=status.HTTP_200_OK,
+)
+async def get_department_stats(
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    department_id: UUID,
+    start: Annotated[date, Query(alias="from")],
+    end: Annotated[date, Query(alias="to")],
+):
+    """
+    Appointment counts by status for each day in [from, to), from the
+    precomputed daily aggregate.
+    """
+    data = await DepartmentStatsService.get_stats(db, department_id, start, end)
     return {"data": data, "status": status.HTTP_200_OK}
 
 
-@router.patch("/{department_id}", response_model=dict, status_code=status.HTTP_200_OK)
+@router.patch(
+    "/{department_id}",
+    response_model=ResponseDto[DepartmentDto],
+    status_code=status.HTTP_200_OK,
+)
 async def update_department(
     db: Annotated[AsyncSession, Depends(get_db)],
     department_id: UUID,
@@ -1,22 +1,36 @@
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from .dto import *
 import logging
-from sqlalchemy import select
+from sqlalchemy import delete, select, update
 from sqlalchemy.exc import IntegrityError
 from src.api.v1.models.department import Department
+from src.api.v1.utils.catalog import DEPARTMENT_CATALOG, catalog_versions
+from src.api.v1.utils.columns import DtoColumns
+from src.api.v1.utils.pagination import DEFAULT_PAGE_LIMIT, Page, keyset, to_page
 from fastapi import HTTPException, status
 
 logger = logging.getLogger(__name__)
 
+DEPARTMENT_COLUMNS = DtoColumns(Department, DepartmentDto)
+
 
 class DepartmentService:
     @staticmethod
-    async def list_departments(db: AsyncSession):
+    async def list_departments(
+        db: AsyncSession, limit: int = DEFAULT_PAGE_LIMIT, after: Optional[str] = None
+    ) -> Page:
         try:
-            result = await db.execute(select(Department))
-            departments = result.scalars().all()
-            
-            return [DepartmentDto.model_validate(d) for d in departments]
+            order_by = (Department.id,)
+            result = await db.execute(
+                keyset(DEPARTMENT_COLUMNS.select(), order_by, limit, after)
+            )
+            page = to_page(result.all(), order_by, limit)
+
+            return Page(DEPARTMENT_COLUMNS.all(page.items), page.next_cursor)
+
+        except HTTPException:
+            raise
 
         except Exception as e:
             raise HTTPException(
@@ -29,8 +43,9 @@ class DepartmentService:
         try:
             department = Department(**dto.model_dump())
             db.add(department)
+            version = await catalog_versions.bump(db, DEPARTMENT_CATALOG)
             await db.commit()
-            await db.refresh(department)
+            catalog_versions.observe(DEPARTMENT_CATALOG, version)
             return DepartmentDto.model_validate(department)
 
         except IntegrityError as e:
@@ -51,16 +66,16 @@ class DepartmentService:
     async def get_department_by_id(db: AsyncSession, department_id: UUID):
         try:
             result = await db.execute(
-                select(Department).where(Department.id == department_id)
+                DEPARTMENT_COLUMNS.select().where(Department.id == department_id)
             )
-            department = result.scalars().first()
+            row = result.first()
 
-            if not department:
+            if not row:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND, detail="Department not found"
                 )
 
-            return DepartmentDto.model_validate(department)
+            return DEPARTMENT_COLUMNS.one(row)
 
         except HTTPException:
             raise
@@ -76,8 +91,15 @@ class DepartmentService:
         db: AsyncSession, department_id: UUID, dto: DepartmentUpdateDto
     ):
         try:
+            update_dict = dto.model_dump(exclude_unset=True)
+            if not update_dict:
+                return await DepartmentService.get_department_by_id(db, department_id)
+
             result = await db.execute(
-                select(Department).where(Department.id == department_id)
+                update(Department)
+                .where(Department.id == department_id)
+                .values(**update_dict)
+                .returning(Department)
             )
             department = result.scalars().first()
 
@@ -86,12 +108,9 @@ class DepartmentService:
                     status_code=status.HTTP_404_NOT_FOUND, detail="Department not found"
                 )
 
-            update_dict = dto.model_dump(exclude_unset=True)
-            for key, value in update_dict.items():
-                setattr(department, key, value)
-
+            version = await catalog_versions.bump(db, DEPARTMENT_CATALOG)
             await db.commit()
-            await db.refresh(department)
+            catalog_versions.observe(DEPARTMENT_CATALOG, version)
             return DepartmentDto.model_validate(department)
 
         except IntegrityError as e:
@@ -115,17 +134,19 @@ class DepartmentService:
     async def delete_department(db: AsyncSession, department_id: UUID):
         try:
             result = await db.execute(
-                select(Department).where(Department.id == department_id)
+                delete(Department)
+                .where(Department.id == department_id)
+                .returning(Department.id)
             )
-            department = result.scalars().first()
 
-            if not department:
+            if result.scalar() is None:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND, detail="Department not found"
                 )
 
-            await db.delete(department)
+            version = await catalog_versions.bump(db, DEPARTMENT_CATALOG)
             await db.commit()
+            catalog_versions.observe(DEPARTMENT_CATALOG, version)
             return None
 
         except IntegrityError as e:
@@ -1 +1,2 @@
-from .dto import *
\ No newline at end of file
+from .dto import *
+from .stats_dto import *
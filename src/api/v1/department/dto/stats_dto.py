@@ -0,0 +1,25 @@
+from datetime import date
+from uuid import UUID
+from pydantic import BaseModel, ConfigDict
+
+
+class StatusCountsDto(BaseModel):
+    booked: int = 0
+    fulfilled: int = 0
+    cancelled: int = 0
+    noshow: int = 0
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class DailyStatsDto(StatusCountsDto):
+    day: date
+
+
+class DepartmentStatsDto(BaseModel):
+    department_id: UUID
+    start: date
+    end: date
+    timezone: str
+    totals: StatusCountsDto
+    days: list[DailyStatsDto]
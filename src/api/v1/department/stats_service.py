@@ -0,0 +1,197 @@
+import datetime
+import logging
+import os
+from collections import defaultdict
+from typing import Iterable, NamedTuple, Optional
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+from fastapi import HTTPException, status
+from sqlalchemy import Date, cast, delete, func, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.v1.models.appointment import Appointment, AppointmentStatus
+from src.api.v1.models.stats import DepartmentDailyStats
+from .dto import DailyStatsDto, DepartmentStatsDto, StatusCountsDto
+
+logger = logging.getLogger(__name__)
+
+# calendar used to bucket appointments into days; changing it needs a rebuild
+STATS_TIMEZONE = os.getenv("STATS_TIMEZONE", "UTC")
+STATS_MAX_DAYS = int(os.getenv("STATS_MAX_DAYS", 366))
+
+# AppointmentStatus member -> counter column
+STATUS_COLUMNS = {s: s.value for s in AppointmentStatus}
+
+# (department_id, day) -> {counter column: delta}
+StatsDelta = dict[tuple[UUID, datetime.date], dict[str, int]]
+
+
+class StatsKey(NamedTuple):
+    """The columns of an appointment that decide which counter it is in."""
+
+    department_id: UUID
+    start_time: datetime.datetime
+    status: AppointmentStatus
+
+
+def _status(value) -> AppointmentStatus:
+    if isinstance(value, AppointmentStatus):
+        return value
+    try:
+        return AppointmentStatus(value)
+    except ValueError:
+        return AppointmentStatus[value]  # member name, as stored by the database
+
+
+def stats_day(start_time: datetime.datetime) -> datetime.date:
+    if start_time.tzinfo is None:
+        start_time = start_time.replace(tzinfo=datetime.timezone.utc)
+    return start_time.astimezone(ZoneInfo(STATS_TIMEZONE)).date()
+
+
+def _bounds(start: datetime.date, end: datetime.date) -> tuple[datetime.datetime, datetime.datetime]:
+    zone = ZoneInfo(STATS_TIMEZONE)
+    return (
+        datetime.datetime.combine(start, datetime.time.min, tzinfo=zone),
+        datetime.datetime.combine(end, datetime.time.min, tzinfo=zone),
+    )
+
+
+class DepartmentStatsService:
+    @staticmethod
+    def delta(
+        rows: Iterable, sign: int = 1, into: Optional[StatsDelta] = None
+    ) -> StatsDelta:
+        """
+        Count appointments (anything with department_id, start_time and status)
+        into a delta; sign -1 takes them out again.
+        """
+        deltas: StatsDelta = into if into is not None else {}
+        for row in rows:
+            key = (row.department_id, stats_day(row.start_time))
+            counts = deltas.setdefault(key, defaultdict(int))
+            counts[STATUS_COLUMNS[_status(row.status)]] += sign
+        return deltas
+
+    @staticmethod
+    async def apply(db: AsyncSession, deltas: StatsDelta) -> None:
+        """
+        Add a delta to the aggregate inside the caller's transaction, as one
+        upsert. Call it as the last statement before commit: it locks the
+        department/day rows until then.
+        """
+        rows = []
+        # a fixed key order keeps concurrent writers from deadlocking
+        for (department_id, day), counts in sorted(deltas.items(), key=lambda i: (str(i[0][0]), i[0][1])):
+            if not any(counts.values()):
+                continue
+            rows.append(
+                {
+                    "department_id": department_id,
+                    "day": day,
+                    **{column: counts.get(column, 0) for column in STATUS_COLUMNS.values()},
+                }
+            )
+        if not rows:
+            return
+
+        query = pg_insert(DepartmentDailyStats).values(rows)
+        query = query.on_conflict_do_update(
+            index_elements=[DepartmentDailyStats.department_id, DepartmentDailyStats.day],
+            set_={
+                column: getattr(DepartmentDailyStats, column) + getattr(query.excluded, column)
+                for column in STATUS_COLUMNS.values()
+            },
+        )
+        await db.execute(query)
+
+    @staticmethod
+    async def rebuild(db: AsyncSession, start: datetime.date, end: datetime.date) -> None:
+        """
+        Recompute the aggregate for days [start, end) from the appointment table,
+        inside the caller's transaction. For bulk loads and backfills.
+        """
+        lower, upper = _bounds(start, end)
+        # waits for in-flight writers and holds new ones off until commit,
+        # so no increment is lost or counted twice
+        await db.execute(
+            text("LOCK TABLE department_daily_stats IN SHARE ROW EXCLUSIVE MODE")
+        )
+        await db.execute(
+            delete(DepartmentDailyStats).where(
+                DepartmentDailyStats.day >= start, DepartmentDailyStats.day < end
+            )
+        )
+        day = cast(func.timezone(STATS_TIMEZONE, Appointment.start_time), Date)
+        counts = select(
+            Appointment.department_id,
+            day,
+            *(
+                func.count().filter(Appointment.status == member)
+                for member in STATUS_COLUMNS
+            ),
+        ).where(Appointment.start_time >= lower, Appointment.start_time < upper)
+        await db.execute(
+            insert(DepartmentDailyStats).from_select(
+                ["department_id", "day", *STATUS_COLUMNS.values()],
+                counts.group_by(Appointment.department_id, day),
+            )
+        )
+
+    @staticmethod
+    async def get_stats(
+        db: AsyncSession, department_id: UUID, start: datetime.date, end: datetime.date
+    ) -> DepartmentStatsDto:
+        """
+        Per-day counts for days [start, end), zero-filled, plus totals.
+        """
+        if end <= start:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="`to` must be after `from`.",
+            )
+        if (end - start).days > STATS_MAX_DAYS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Range must not exceed {STATS_MAX_DAYS} days.",
+            )
+
+        try:
+            result = await db.execute(
+                select(DepartmentDailyStats).where(
+                    DepartmentDailyStats.department_id == department_id,
+                    DepartmentDailyStats.day >= start,
+                    DepartmentDailyStats.day < end,
+                )
+            )
+            stored = {row.day: row for row in result.scalars().all()}
+        except Exception as e:
+            logger.error(f"Error retrieving department stats: {str(e)}", exc_info=True)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error retrieving department stats",
+            )
+
+        days = []
+        totals = defaultdict(int)
+        for offset in range((end - start).days):
+            day = start + datetime.timedelta(days=offset)
+            row = stored.get(day)
+            counts = {
+                column: getattr(row, column) if row else 0
+                for column in STATUS_COLUMNS.values()
+            }
+            for column, count in counts.items():
+                totals[column] += count
+            days.append(DailyStatsDto(day=day, **counts))
+
+        return DepartmentStatsDto(
+            department_id=department_id,
+            start=start,
+            end=end,
+            timezone=STATS_TIMEZONE,
+            totals=StatusCountsDto(**totals),
+            days=days,
+        )
@@ -1,36 +1,76 @@
+import datetime
 from datetime import date
-from typing import Annotated, Literal
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Annotated, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from uuid import UUID
 
+from src.api.v1.availability import AvailabilityService
+from src.api.v1.availability.dto import AvailabilityDto
 from src.api.v1.models.department import Department
-from src.api.v1.response_dto import ResponseDto
-from src.config.db import get_db
-from .doctor_service import DoctorService
+from src.api.v1.response_dto import PaginatedResponseDto, ResponseDto
+from src.api.v1.utils.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
+from src.api.v1.utils.idempotency import IdempotentRoute
+from src.config.db import get_db, get_read_db
+from .doctor_service import SCHEDULE_TIMEZONE, DoctorService
 from .dto import *
 import logging
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-router = APIRouter(prefix="/doctors", tags=["Doctors"])
+router = APIRouter(prefix="/doctors", tags=["Doctors"], route_class=IdempotentRoute)
 
 
-@router.get("", response_model=ResponseDto, status_code=status.HTTP_200_OK)
+@router.get(
+    "",
+    response_model=PaginatedResponseDto[list[DoctorProfileDto]],
+    status_code=status.HTTP_200_OK,
+)
 async def list_doctors(
     # user_data: Annotated[
     #     UserData, Depends(require_permission(EPermission.READ_DOCTOR))
     # ],
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_LIMIT)] = DEFAULT_PAGE_LIMIT,
+    after: Optional[str] = None,
 ):
     """
-    List doctors.
+    List doctors, one page at a time.
     """
-    data = await DoctorService.list_doctors(db)
-    return {"data": data, "status": status.HTTP_200_OK}
+    page = await DoctorService.list_doctors(db, limit, after)
+    return {
+        "data": page.items,
+        "next_cursor": page.next_cursor,
+        "status": status.HTTP_200_OK,
+    }
 
 
-@router.post("", response_model=ResponseDto, status_code=status.HTTP_201_CREATED)
+@router.get(
+    "/search",
+    response_model=PaginatedResponseDto[list[DoctorProfileDto]],
+    status_code=status.HTTP_200_OK,
+)
+async def search_doctors(
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    doctor_filter_dto: Annotated[DoctorFilterDto, Depends()],
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_LIMIT)] = DEFAULT_PAGE_LIMIT,
+    after: Optional[str] = None,
+):
+    """
+    Search doctors by name, gender, dob, phone, address and department.
+    With a name, results are ranked by similarity to it.
+    """
+    page = await DoctorService.search_doctors(db, doctor_filter_dto, limit, after)
+    return {
+        "data": page.items,
+        "next_cursor": page.next_cursor,
+        "status": status.HTTP_200_OK,
+    }
+
+
+@router.post(
+    "", response_model=ResponseDto[DoctorProfileDto], status_code=status.HTTP_201_CREATED
+)
 async def create_doctor(
     # user_data: Annotated[
     #     UserData, Depends(require_permission(EPermission.CREATE_DOCTOR))
@@ -43,17 +83,57 @@ async def create_doctor(
     return {"data": data, "status": status.HTTP_201_CREATED}
 
 
-@router.get("/{doctor_id}", response_model=ResponseDto, status_code=status.HTTP_200_OK)
+@router.get(
+    "/{doctor_id}",
+    response_model=ResponseDto[DoctorProfileDto],
+    status_code=status.HTTP_200_OK,
+)
 async def get_doctor_by_id(
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     doctor_id: UUID,
 ):
     data = await DoctorService.get_doctor_by_id(db, doctor_id)
     return {"data": data, "status": status.HTTP_200_OK}
 
 
+@router.get(
+    "/{doctor_id}/availability",
+    response_model=ResponseDto[AvailabilityDto],
+    status_code=status.HTTP_200_OK,
+)
+async def get_doctor_availability(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    doctor_id: UUID,
+    start: Annotated[datetime.datetime, Query(alias="from")],
+    end: Annotated[datetime.datetime, Query(alias="to")],
+):
+    """Free time intervals of a doctor within [from, to)."""
+    data = await AvailabilityService.get_availability(
+        db, "doctor", doctor_id, start, end
+    )
+    return {"data": data, "status": status.HTTP_200_OK}
+
+
+@router.get(
+    "/{doctor_id}/schedule",
+    response_model=ResponseDto[DoctorScheduleDto],
+    status_code=status.HTTP_200_OK,
+)
+async def get_doctor_schedule(
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    doctor_id: UUID,
+    day: Annotated[date, Query(alias="date")],
+    tz: Annotated[str, Query(max_length=64)] = SCHEDULE_TIMEZONE,
+):
+    """A doctor's appointments on one day, with patient name and reason."""
+    data = await DoctorService.get_schedule(db, doctor_id, day, tz)
+    return {"data": data, "status": status.HTTP_200_OK}
+
+
 @router.patch(
-    "/{doctor_id}", response_model=ResponseDto, status_code=status.HTTP_202_ACCEPTED
+    "/{doctor_id}",
+    response_model=ResponseDto[DoctorProfileDto],
+    status_code=status.HTTP_202_ACCEPTED,
 )
 async def update_doctor(
     # user_data: Annotated[
@@ -1,70 +1,209 @@
+import os
+from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
+from src.api.v1.availability import department_roster
+from src.api.v1.models.appointment import Appointment, Reason
 from src.api.v1.models.auth import DoctorProfile
-from src.api.v1.models.department import Department
+from src.api.v1.utils.columns import DtoColumns
+from src.api.v1.utils.pagination import DEFAULT_PAGE_LIMIT, Page, keyset, to_page
+from src.api.v1.utils.search import contains
 from .dto import *
 import logging
-from sqlalchemy import select
+from sqlalchemy import Float, delete, func, or_, select, update
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 
 logger = logging.getLogger(__name__)
 
+# SQLSTATE raised by Postgres when a foreign key points at a missing row
+FOREIGN_KEY_VIOLATION = "23503"
+
+# timezone whose calendar days /schedule uses unless the caller passes one
+SCHEDULE_TIMEZONE = os.getenv("SCHEDULE_TIMEZONE", "UTC")
+
+DOCTOR_COLUMNS = DtoColumns(DoctorProfile, DoctorProfileDto)
+
 
 class DoctorService:
     @staticmethod
-    async def list_doctors(db: AsyncSession):
+    async def list_doctors(
+        db: AsyncSession, limit: int = DEFAULT_PAGE_LIMIT, after: Optional[str] = None
+    ) -> Page:
         try:
-            query = select(DoctorProfile)
-
-            # if doctor_filter_dto.id:
-            #     query = query.where(DoctorProfile.id == id)
-            # if doctor_filter_dto.name:
-            #     query = query.where(
-            #         DoctorProfile.full_name.icontains(doctor_filter_dto.name)
-            #     )
-            # if doctor_filter_dto.gender:
-            #     query = query.where(DoctorProfile.gender == doctor_filter_dto.gender)
-            # if doctor_filter_dto.dob:
-            #     query = query.where(DoctorProfile.dob == doctor_filter_dto.dob)
-            # # if doctor_filter_dto.specialty:
-            # #     query = query.where(
-            # #         DoctorProfile.specialty.icontains(doctor_filter_dto.specialty)
-            # #     )
-            # if doctor_filter_dto.phone:
-            #     query = query.where(
-            #         DoctorProfile.phone.ilike(f"%{doctor_filter_dto.phone}%")
-            #     )
-            # if doctor_filter_dto.address:
-            #     query = query.where(
-            #         DoctorProfile.address.icontains(doctor_filter_dto.address)
-            #     )
-
-            logger.debug(f"Executing query: {query}")
+            query = DOCTOR_COLUMNS.select()
+
+            order_by = (DoctorProfile.id,)
+            query = keyset(query, order_by, limit, after)
+
+            logger.debug("Executing query: %s", query)  # compiled only if emitted
 
             result = await db.execute(query)
-            doctors = result.scalars().all()  # returns a list
+            page = to_page(result.all(), order_by, limit)
 
-            return [DoctorProfileDto.model_validate(d) for d in doctors]
+            return Page(DOCTOR_COLUMNS.all(page.items), page.next_cursor)
+
+        except HTTPException:
+            raise
 
         except Exception as e:
             logger.error(f"Error fetching doctors: {str(e)}", exc_info=True)
             raise HTTPException(status_code=500, detail="Error retrieving doctors")
 
+    @staticmethod
+    async def search_doctors(
+        db: AsyncSession,
+        doctor_filter_dto: DoctorFilterDto,
+        limit: int = DEFAULT_PAGE_LIMIT,
+        after: Optional[str] = None,
+    ) -> Page:
+        """
+        Filter doctors; with a name, rank by trigram similarity to it.
+
+        Text filters are substring matches served by the GIN trigram indexes,
+        the name also matches misspellings through the similarity operator.
+        """
+        try:
+            query = DOCTOR_COLUMNS.select()
+            order_by: tuple = (DoctorProfile.id,)
+
+            if doctor_filter_dto.name:
+                name = doctor_filter_dto.name
+                query = query.where(
+                    or_(
+                        contains(DoctorProfile.full_name, name),
+                        DoctorProfile.full_name.op("%")(name),
+                    )
+                )
+                # negated so the keyset runs ascending: best match first
+                rank = (
+                    -func.similarity(DoctorProfile.full_name, name, type_=Float)
+                ).label("rank")
+                query = query.add_columns(rank)
+                order_by = (rank, DoctorProfile.id)
+            if doctor_filter_dto.gender:
+                query = query.where(DoctorProfile.gender == doctor_filter_dto.gender)
+            if doctor_filter_dto.dob:
+                query = query.where(DoctorProfile.dob == doctor_filter_dto.dob)
+            if doctor_filter_dto.phone:
+                query = query.where(contains(DoctorProfile.phone, doctor_filter_dto.phone))
+            if doctor_filter_dto.address:
+                query = query.where(
+                    contains(DoctorProfile.address, doctor_filter_dto.address)
+                )
+            if doctor_filter_dto.department_id:
+                query = query.where(
+                    DoctorProfile.department_id == doctor_filter_dto.department_id
+                )
+
+            query = keyset(query, order_by, limit, after)
+            logger.debug("Executing query: %s", query)  # compiled only if emitted
+
+            result = await db.execute(query)
+            rows = result.all()
+            page = to_page(rows, order_by, limit)
+
+            return Page(DOCTOR_COLUMNS.all(page.items), page.next_cursor)
+
+        except HTTPException:
+            raise
+
+        except Exception as e:
+            logger.error(f"Error searching doctors: {str(e)}", exc_info=True)
+            raise HTTPException(status_code=500, detail="Error searching doctors")
+
+    @staticmethod
+    async def get_schedule(
+        db: AsyncSession, doctor_id: UUID, day: datetime.date, tz: str = SCHEDULE_TIMEZONE
+    ) -> DoctorScheduleDto:
+        """
+        A doctor's appointments starting on `day` in timezone `tz`, with patient
+        name and reason display.
+
+        One statement: patients are joined eagerly and reasons joined for their
+        display, however many appointments the day has. The doctor is looked up
+        only when the day is empty, to tell "no appointments" from 404.
+        """
+        try:
+            zone = ZoneInfo(tz)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown timezone {tz}",
+            )
+
+        start = datetime.datetime.combine(day, datetime.time.min, tzinfo=zone)
+        end = datetime.datetime.combine(
+            day + datetime.timedelta(days=1), datetime.time.min, tzinfo=zone
+        )
+        try:
+            query = (
+                select(Appointment, Reason.display)
+                .outerjoin(Reason, Reason.code == Appointment.reason)
+                .options(joinedload(Appointment.patient, innerjoin=True))
+                .where(
+                    Appointment.doctor_id == doctor_id,
+                    Appointment.start_time >= start,
+                    Appointment.start_time < end,
+                )
+                .order_by(Appointment.start_time, Appointment.id)
+            )
+            result = await db.execute(query)
+            rows = result.all()
+
+            if not rows:
+                exists = await db.scalar(
+                    select(DoctorProfile.id).where(DoctorProfile.id == doctor_id)
+                )
+                if exists is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail=f"Doctor with id {doctor_id} not found",
+                    )
+
+            return DoctorScheduleDto(
+                doctor_id=doctor_id,
+                date=day,
+                timezone=tz,
+                appointments=[
+                    ScheduleEntryDto(
+                        id=appt.id,
+                        start_time=appt.start_time,
+                        end_time=appt.end_time,
+                        status=appt.status,
+                        patient_id=appt.patient_id,
+                        patient_name=appt.patient.full_name,
+                        patient_phone=appt.patient.phone,
+                        reason_code=appt.reason,
+                        reason_display=display,
+                        notes=appt.notes,
+                    )
+                    for appt, display in rows
+                ],
+            )
+
+        except HTTPException:
+            raise
+
+        except Exception as e:
+            logger.error(f"Error fetching schedule of doctor {doctor_id}: {e}", exc_info=True)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error retrieving schedule",
+            )
+
     @staticmethod
     async def create_doctor(db: AsyncSession, dto: DoctorProfileDto):
         try:
             doctor = DoctorProfile(**dto.model_dump())
 
             db.add(doctor)
-            await db.commit()
-            await db.refresh(
-                doctor
-            )  # doctor now contains the database-generated values
+            await db.commit()  # values stay loaded, no refresh needed
+            department_roster.invalidate()
 
-            DoctorProfileDto.model_validate(doctor)
-
-            return doctor
+            return DoctorProfileDto.model_validate(doctor)
         except (
             IntegrityError
         ) as e:  # client sent data that violates database constraints
@@ -86,17 +225,17 @@ class DoctorService:
     @staticmethod
     async def get_doctor_by_id(db: AsyncSession, doctor_id: UUID):
         try:
-            query = select(DoctorProfile).where(DoctorProfile.id == doctor_id)
+            query = DOCTOR_COLUMNS.select().where(DoctorProfile.id == doctor_id)
             result = await db.execute(query)
 
-            doctor = result.scalars().first()
-            if not doctor:
+            row = result.first()
+            if not row:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail=f"Doctor with id {doctor_id} not found",
                 )
 
-            return doctor
+            return DOCTOR_COLUMNS.one(row)
         except HTTPException:
             logger.error(f"Doctor with id {doctor_id} not found.")
             raise
@@ -115,9 +254,15 @@ class DoctorService:
     @staticmethod
     async def update_doctor(db: AsyncSession, doctor_id: UUID, dto: DoctorUpdateDto):
         try:
-            # 1. fetch existing entity
-            query = select(DoctorProfile).where(DoctorProfile.id == doctor_id)
-            result = await db.execute(query)
+            # 1. apply partial updates in one UPDATE ... RETURNING
+            update_dict = dto.model_dump(exclude_unset=True)
+            if update_dict:
+                query = update(DoctorProfile).values(**update_dict).returning(DoctorProfile)
+            else:
+                query = select(DoctorProfile)
+            result = await db.execute(query.where(DoctorProfile.id == doctor_id))
+
+            # 2. no row returned means no such doctor
             doctor = result.scalars().first()
             if not doctor:
                 raise HTTPException(
@@ -125,35 +270,23 @@ class DoctorService:
                     detail=f"Doctor with id {doctor_id} not found",
                 )
 
-            # 2. validate department if provided
-            if dto.department_id:
-                dept_query = select(Department).where(
-                    Department.id == dto.department_id
-                )
-                dept_result = await db.execute(dept_query)
-                department = dept_result.scalars().first()
-                if not department:
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail=f"Department with id {dto.department_id} not found",
-                    )
-
-            # 3. apply partial updates
-            update_dict = dto.model_dump(exclude_unset=True)
-            for key, value in update_dict.items():
-                setattr(doctor, key, value)
-
-            # 4. commit changes
+            # 3. commit changes
             await db.commit()
-            await db.refresh(doctor)  # refresh to get updated values
+            department_roster.invalidate()
 
-            return doctor
+            return DoctorProfileDto.model_validate(doctor)
 
         except HTTPException:
             logger.error(f"Doctor with id {doctor_id} not found.")
             raise
         except IntegrityError as e:
             await db.rollback()
+            # the department foreign key is the only one an update can break
+            if getattr(e.orig, "sqlstate", None) == FOREIGN_KEY_VIOLATION:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Department with id {dto.department_id} not found",
+                )
             logger.error(f"Database error while updating doctor {doctor_id}: {e}")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -170,17 +303,26 @@ class DoctorService:
     @staticmethod
     async def delete_doctor(db: AsyncSession, doctor_id: UUID):
         try:
-            query = select(DoctorProfile).where(DoctorProfile.id == doctor_id)
-            result = await db.execute(query)
-            doctor = result.scalars().first()
-            if not doctor:
+            # appointments outlive the doctor, unassigned
+            await db.execute(
+                update(Appointment)
+                .where(Appointment.doctor_id == doctor_id)
+                .values(doctor_id=None)
+            )
+            result = await db.execute(
+                delete(DoctorProfile)
+                .where(DoctorProfile.id == doctor_id)
+                .returning(DoctorProfile.id)
+            )
+            if result.scalar() is None:
+                await db.rollback()
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail=f"Doctor with id {doctor_id} not found",
                 )
 
-            await db.delete(doctor)
             await db.commit()
+            department_roster.invalidate()
 
         except HTTPException:
             logger.error(f"Doctor with id {doctor_id} not found.")
@@ -1,5 +1,5 @@
 from typing import Literal, Optional
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 import datetime
 from uuid import UUID
 
@@ -17,6 +17,15 @@ class DoctorProfileDto(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class DoctorFilterDto(BaseModel):
+    name: Optional[str] = Field(None, min_length=1)
+    gender: Optional[Literal["Male", "Female"]] = None
+    dob: Optional[datetime.date] = None
+    phone: Optional[str] = Field(None, min_length=1)
+    address: Optional[str] = Field(None, min_length=1)
+    department_id: Optional[UUID] = None
+
+
 class DoctorUpdateDto(BaseModel):
     full_name: Optional[str] = None
     gender: Optional[Literal["Male", "Female"]] = None
@@ -24,3 +33,23 @@ class DoctorUpdateDto(BaseModel):
     phone: Optional[str] = None
     address: Optional[str] = None
     department_id: Optional[UUID] = None
+
+
+class ScheduleEntryDto(BaseModel):
+    id: UUID
+    start_time: datetime.datetime
+    end_time: datetime.datetime
+    status: str
+    patient_id: UUID
+    patient_name: str
+    patient_phone: str
+    reason_code: Optional[str]
+    reason_display: Optional[str]
+    notes: Optional[str]
+
+
+class DoctorScheduleDto(BaseModel):
+    doctor_id: UUID
+    date: datetime.date
+    timezone: str
+    appointments: list[ScheduleEntryDto]
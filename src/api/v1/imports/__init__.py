@@ -0,0 +1 @@
+from .import_controller import router
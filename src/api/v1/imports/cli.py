@@ -0,0 +1,53 @@
+"""
+Command line entry point for bulk imports.
+
+Usage:
+    python -m src.api.v1.imports.cli patients patients.csv
+    python -m src.api.v1.imports.cli appointments history.ndjson --format ndjson
+"""
+
+import argparse
+import asyncio
+
+from src.config.db import config, session_manager
+from .dto import ImportReportDto
+from .import_service import IMPORT_KINDS, ImportService
+
+
+def _print_progress(report: ImportReportDto):
+    print(
+        f"read {report.total}, staged {report.staged}, rejected {report.rejected}",
+        flush=True,
+    )
+
+
+async def run(kind: str, path: str, fmt: str) -> ImportReportDto:
+    session_manager.init(config.DB_CONFIG)
+    try:
+        with open(path, "rb") as file:
+            async with session_manager.session() as db:
+                return await ImportService.import_file(
+                    db, kind, file, fmt, on_progress=_print_progress
+                )
+    finally:
+        await session_manager.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import rows via COPY.")
+    parser.add_argument("kind", choices=sorted(IMPORT_KINDS))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.kind, args.path, args.format))
+    print(
+        f"inserted {report.inserted}, skipped {report.skipped}, "
+        f"rejected {report.rejected} of {report.total}"
+    )
+    for rejection in report.rejections:
+        print(f"  line {rejection.line}: {rejection.error}")
+
+
+if __name__ == "__main__":
+    main()
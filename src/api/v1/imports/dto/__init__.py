@@ -0,0 +1 @@
+from .dto import *
\ No newline at end of file
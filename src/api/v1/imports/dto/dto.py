@@ -0,0 +1,40 @@
+from uuid import UUID
+from pydantic import BaseModel, model_validator
+from datetime import datetime
+from typing import Optional
+
+from src.api.v1.models.appointment import AppointmentStatus
+
+
+class AppointmentImportDto(BaseModel):
+    id: Optional[UUID] = None
+    patient_id: UUID
+    department_id: UUID
+    doctor_id: Optional[UUID] = None
+    start_time: datetime
+    end_time: datetime
+    status: AppointmentStatus
+    reason: str
+    notes: Optional[str] = None
+    patient_instruction: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_slot(self) -> "AppointmentImportDto":
+        if self.end_time <= self.start_time:
+            raise ValueError("end_time must be after start_time.")
+        return self
+
+
+class ImportRejectionDto(BaseModel):
+    line: int
+    error: str
+
+
+class ImportReportDto(BaseModel):
+    kind: str
+    total: int
+    staged: int
+    inserted: int
+    skipped: int
+    rejected: int
+    rejections: list[ImportRejectionDto]
@@ -0,0 +1,36 @@
+from typing import Annotated
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.v1.auth.dto.auth_dto import UserDto
+from src.api.v1.models.auth import Role
+from src.api.v1.response_dto import ResponseDto
+from src.api.v1.utils.security import get_current_user
+from src.api.v1.utils.negotiation import NegotiatedRoute
+from src.config.db import get_db
+from .dto import ImportReportDto
+from .import_service import ImportFormat, ImportService
+
+# not IdempotentRoute: fingerprinting the body would read whole uploads into memory
+router = APIRouter(prefix="/imports", tags=["Imports"], route_class=NegotiatedRoute)
+
+
+@router.post(
+    "/{kind}", response_model=ResponseDto[ImportReportDto], status_code=status.HTTP_200_OK
+)
+async def import_file(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[UserDto, Depends(get_current_user)],
+    kind: str,
+    file: UploadFile,
+    fmt: Annotated[ImportFormat, Query(alias="format")] = "csv",
+):
+    """
+    Bulk import `patients` or `appointments` from a CSV or NDJSON upload.
+    Admin only.
+    """
+    if current_user.role != Role.ADMIN:
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+    data = await ImportService.import_file(db, kind, file.file, fmt)
+    return {"data": data, "status": status.HTTP_200_OK}
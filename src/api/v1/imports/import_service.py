@@ -0,0 +1,218 @@
+import csv
+import io
+import json
+import logging
+import os
+import uuid
+from datetime import timedelta
+from itertools import islice
+from typing import IO, Any, Awaitable, Callable, Iterator, Literal, NamedTuple, Optional
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from src.api.v1.department.stats_service import DepartmentStatsService, stats_day
+from src.api.v1.patient.dto.dto import PatientProfileDto
+from .dto import *
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 5000))
+IMPORT_MAX_REPORTED_REJECTIONS = int(os.getenv("IMPORT_MAX_REPORTED_REJECTIONS", 1000))
+
+STAGING_TABLE = "import_staging"
+
+ImportFormat = Literal["csv", "ndjson"]
+
+
+class ImportKind(NamedTuple):
+    table: str
+    dto: type[BaseModel]
+    # rows failing this predicate (missing parents) are skipped at merge time
+    merge_filter: str
+    to_record: Callable[[BaseModel], tuple]
+    # runs in the import transaction after rows were merged
+    after_merge: Optional[Callable[[AsyncSession], Awaitable[None]]] = None
+
+
+def _patient_record(dto: PatientProfileDto) -> tuple:
+    return tuple(getattr(dto, f) for f in PatientProfileDto.model_fields)
+
+
+def _appointment_record(dto: AppointmentImportDto) -> tuple:
+    values = dto.model_dump()
+    values["id"] = values["id"] or uuid.uuid4()
+    values["status"] = dto.status.name  # the database enum stores member names
+    return tuple(values[f] for f in AppointmentImportDto.model_fields)
+
+
+async def _rebuild_appointment_stats(db: AsyncSession):
+    # merged rows are not known one by one, recompute the days they can touch
+    first, last = (
+        await db.execute(
+            text(f"SELECT min(start_time), max(start_time) FROM {STAGING_TABLE}")
+        )
+    ).one()
+    if first is not None:
+        await DepartmentStatsService.rebuild(
+            db, stats_day(first), stats_day(last) + timedelta(days=1)
+        )
+
+
+IMPORT_KINDS: dict[str, ImportKind] = {
+    "patients": ImportKind(
+        table="patient_profile",
+        dto=PatientProfileDto,
+        merge_filter='EXISTS (SELECT 1 FROM "user" u WHERE u.id = s.user_id)',
+        to_record=_patient_record,
+    ),
+    "appointments": ImportKind(
+        table="appointment",
+        dto=AppointmentImportDto,
+        merge_filter=(
+            "EXISTS (SELECT 1 FROM patient_profile p WHERE p.id = s.patient_id)"
+            " AND EXISTS (SELECT 1 FROM department d WHERE d.id = s.department_id)"
+            " AND (s.doctor_id IS NULL"
+            " OR EXISTS (SELECT 1 FROM doctor_profile dp WHERE dp.id = s.doctor_id))"
+            " AND EXISTS (SELECT 1 FROM reason r WHERE r.code = s.reason)"
+            # rows are validated on parse, but a bad range would abort the whole merge
+            " AND s.end_time > s.start_time"
+        ),
+        to_record=_appointment_record,
+        after_merge=_rebuild_appointment_stats,
+    ),
+}
+
+
+def read_records(
+    file: IO[bytes], fmt: ImportFormat
+) -> Iterator[tuple[int, dict | Exception]]:
+    """
+    Lazily parse an uploaded file into (line number, record) pairs.
+    Lines that cannot be parsed are yielded as the exception instead.
+    """
+    stream = io.TextIOWrapper(file, encoding="utf-8", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            # empty CSV cells mean "not provided"
+            yield reader.line_num, {k: (v if v != "" else None) for k, v in record.items()}
+    else:
+        for line_num, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_num, json.loads(line)
+            except ValueError as e:
+                yield line_num, e
+
+
+class ImportService:
+    @staticmethod
+    async def import_file(
+        db: AsyncSession,
+        kind: str,
+        file: IO[bytes],
+        fmt: ImportFormat,
+        on_progress: Optional[Callable[[ImportReportDto], Any]] = None,
+    ) -> ImportReportDto:
+        """
+        Validate the file in chunks, COPY valid rows into a staging table, then
+        merge them into the target table in the same transaction.
+
+        Rows violating a unique or exclusion constraint, or referencing a
+        missing parent row, are skipped by the merge and counted as such.
+        """
+        import_kind = IMPORT_KINDS.get(kind)
+        if import_kind is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Unknown import kind '{kind}'.",
+            )
+        columns = list(import_kind.dto.model_fields)
+        report = ImportReportDto(
+            kind=kind, total=0, staged=0, inserted=0, skipped=0, rejected=0, rejections=[]
+        )
+
+        def reject(line: int, error: str):
+            report.rejected += 1
+            if len(report.rejections) < IMPORT_MAX_REPORTED_REJECTIONS:
+                report.rejections.append(ImportRejectionDto(line=line, error=error))
+
+        try:
+            # executed through the session so the COPY below joins its transaction
+            await db.execute(
+                text(
+                    f"CREATE TEMP TABLE {STAGING_TABLE} "
+                    f"(LIKE {import_kind.table} INCLUDING DEFAULTS) ON COMMIT DROP"
+                )
+            )
+            connection = await db.connection()
+            raw = await connection.get_raw_connection()
+            driver = raw.driver_connection
+
+            records = read_records(file, fmt)
+            while True:
+                chunk = await run_in_threadpool(
+                    lambda: list(islice(records, IMPORT_CHUNK_SIZE))
+                )
+                if not chunk:
+                    break
+
+                rows = []
+                for line, record in chunk:
+                    report.total += 1
+                    if isinstance(record, Exception):
+                        reject(line, f"Unparseable line: {str(record)}")
+                        continue
+                    try:
+                        dto = import_kind.dto.model_validate(record)
+                    except ValidationError as e:
+                        reject(line, str(e))
+                        continue
+                    rows.append(import_kind.to_record(dto))
+
+                if rows:
+                    await driver.copy_records_to_table(
+                        STAGING_TABLE, records=rows, columns=columns
+                    )
+                    report.staged += len(rows)
+                logger.info(
+                    f"Import {kind}: read {report.total}, staged {report.staged}, "
+                    f"rejected {report.rejected}"
+                )
+                if on_progress:
+                    on_progress(report)
+
+            column_list = ", ".join(f'"{c}"' for c in columns)
+            result = await db.execute(
+                text(
+                    f"INSERT INTO {import_kind.table} ({column_list}) "
+                    f"SELECT {column_list} FROM {STAGING_TABLE} s "
+                    f"WHERE {import_kind.merge_filter} "
+                    "ON CONFLICT DO NOTHING"
+                )
+            )
+            report.inserted = result.rowcount
+            report.skipped = report.staged - report.inserted
+            if report.inserted and import_kind.after_merge:
+                await import_kind.after_merge(db)
+            await db.commit()
+        except HTTPException:
+            raise
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error importing {kind}: {str(e)}", exc_info=True)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error importing {kind}",
+            )
+
+        logger.info(
+            f"Import {kind} done: inserted {report.inserted}, skipped {report.skipped}, "
+            f"rejected {report.rejected}"
+        )
+        return report
@@ -2,3 +2,6 @@ from .appointment import *
 from .department import *
 # from .working_hours import *
 from .auth import *
+from .catalog import *
+from .stats import *
+from .idempotency import *
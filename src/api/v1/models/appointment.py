@@ -10,7 +10,12 @@ from sqlalchemy import (
     func,
     Enum as SQLAlchemyEnum,
     INTEGER,
+    DDL,
+    Index,
+    event,
+    text,
 )
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.orm import (
     mapped_column,  # detailed column configuration (constraints, defaults, etc.)
     relationship,  # link b/w ORM classes (not db columns), bidirectional with back_populates
@@ -40,8 +45,45 @@ class Reason(Base):
     display: Mapped[str] = mapped_column(Text, nullable=False)
 
 
+# name of the exclusion constraint that rejects overlapping BOOKED appointments of a doctor
+APPOINTMENT_NO_OVERLAP_CONSTRAINT = "appointment_doctor_no_overlap"
+
+
 class Appointment(Base):
     __tablename__ = "appointment"
+    __table_args__ = (
+        ExcludeConstraint(
+            ("doctor_id", "="),
+            (text("tstzrange(start_time, end_time, '[)')"), "&&"),
+            name=APPOINTMENT_NO_OVERLAP_CONSTRAINT,
+            using="gist",
+            where=text("status = 'BOOKED'"),
+        ),
+        # keyset pagination order for appointment listings
+        Index("ix_appointment_start_time_id", "start_time", "id"),
+        # filtered listings / schedule views: equality column, then the keyset order
+        Index("ix_appointment_doctor_id_start_time_id", "doctor_id", "start_time", "id"),
+        Index(
+            "ix_appointment_department_id_start_time_id",
+            "department_id",
+            "start_time",
+            "id",
+        ),
+        # newest first for a patient's history, scanned backwards for the keyset order
+        Index(
+            "ix_appointment_patient_id_start_time_id",
+            "patient_id",
+            text("start_time DESC"),
+            text("id DESC"),
+        ),
+        # upcoming bookings, a small slice of the table
+        Index(
+            "ix_appointment_booked_start_time_id",
+            "start_time",
+            "id",
+            postgresql_where=text("status = 'BOOKED'"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -67,25 +109,22 @@ class Appointment(Base):
         doc="Thời điểm kết thúc cuộc hẹn (theo chuẩn ISO 8601, múi giờ UTC).",
     )
 
-    # Foreign Keys
+    # Foreign Keys, indexed through the composite indexes above
     patient_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("patient_profile.id", ondelete="RESTRICT"),
         nullable=False,
-        index=True,
         doc="Tham chiếu đến bệnh nhân (User) tham gia cuộc hẹn.",
     )
 
     doctor_id: Mapped[Optional[uuid.UUID]] = mapped_column(
         ForeignKey("doctor_profile.id", ondelete="RESTRICT"),
         nullable=True,
-        index=True,
         doc="Tham chiếu đến bác sĩ cụ thể (nếu có).",
     )
 
     department_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("department.id", ondelete="RESTRICT"),
         nullable=False,
-        index=True,
         doc="Tham chiếu đến khoa thực hiện dịch vụ (tương đương serviceType trong FHIR).",
     )
 
@@ -117,7 +156,18 @@ class Appointment(Base):
         nullable=False,
     )
 
+    # fetch created_at / updated_at through RETURNING on insert and update
+    __mapper_args__ = {"eager_defaults": True}
+
     # relationships
     patient: Mapped["PatientProfile"] = relationship(back_populates="appointments")
     doctor: Mapped[Optional["DoctorProfile"]] = relationship(back_populates="appointments")
     department: Mapped["Department"] = relationship(back_populates="appointments")
+
+
+# gist exclusion over a uuid equality needs btree_gist
+event.listen(
+    Appointment.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"),
+)
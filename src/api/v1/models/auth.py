@@ -2,7 +2,20 @@ import datetime
 from enum import Enum
 import uuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, UUID, Enum as SQLAlchemyEnum, ForeignKey, Text, Date
+from sqlalchemy import (
+    String,
+    UUID,
+    Enum as SQLAlchemyEnum,
+    ForeignKey,
+    Text,
+    Date,
+    DateTime,
+    DDL,
+    Index,
+    event,
+    func,
+    literal_column,
+)
 from ....config.db import Base
 from typing import TYPE_CHECKING
 
@@ -40,6 +53,23 @@ class User(Base):
     )
 
 
+class TokenRevocation(Base):
+    """
+    Access tokens of the user issued before `revoked_at` are no longer accepted.
+    """
+
+    __tablename__ = "token_revocation"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("user.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    revoked_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
 class PatientProfile(Base):
     __tablename__ = "patient_profile"
 
@@ -67,6 +97,28 @@ class PatientProfile(Base):
 
 class DoctorProfile(Base):
     __tablename__ = "doctor_profile"
+    __table_args__ = (
+        # trigram indexes serve ILIKE '%...%' and similarity (%) searches
+        Index(
+            "ix_doctor_profile_full_name_trgm",
+            "full_name",
+            postgresql_using="gin",
+            postgresql_ops={"full_name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_doctor_profile_phone_trgm",
+            "phone",
+            postgresql_using="gin",
+            postgresql_ops={"phone": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_doctor_profile_address_trgm",
+            "address",
+            postgresql_using="gin",
+            postgresql_ops={"address": "gin_trgm_ops"},
+        ),
+        Index("ix_doctor_profile_department_id_id", "department_id", "id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -96,3 +148,50 @@ class DoctorProfile(Base):
 
     # 1 doctor - many appointments
     appointments: Mapped[list["Appointment"]] = relationship(back_populates="doctor")
+
+
+event.listen(
+    DoctorProfile.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
+# IMMUTABLE wrapper around unaccent (which is only STABLE) so it can be indexed;
+# lowercases and strips diacritics, "Nguyễn Văn Đức" -> "nguyen van duc"
+SEARCH_NORMALIZE_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    "CREATE OR REPLACE FUNCTION search_normalize(text) RETURNS text "
+    "LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE "
+    "AS $$ SELECT lower(public.unaccent('public.unaccent'::regdictionary, $1)) $$",
+)
+
+
+def search_normalize(expr):
+    return func.search_normalize(expr, type_=Text)
+
+
+# the indexed expression patient search matches against
+_space = literal_column("' '", Text)
+patient_search_document = search_normalize(
+    PatientProfile.full_name + _space + PatientProfile.phone + _space + PatientProfile.address
+)
+
+Index(
+    "ix_patient_profile_search_trgm",
+    patient_search_document.label("search_document"),
+    postgresql_using="gin",
+    postgresql_ops={"search_document": "gin_trgm_ops"},
+).ddl_if(dialect="postgresql")
+
+event.listen(
+    PatientProfile.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+for _statement in SEARCH_NORMALIZE_DDL:
+    event.listen(
+        PatientProfile.__table__,
+        "before_create",
+        DDL(_statement).execute_if(dialect="postgresql"),
+    )
@@ -0,0 +1,16 @@
+from sqlalchemy import BigInteger, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ....config.db import Base
+
+
+class CatalogVersion(Base):
+    """
+    Monotonic version of a rarely changing catalog (e.g. departments),
+    bumped in the same transaction as every write to it.
+    """
+
+    __tablename__ = "catalog_version"
+
+    name: Mapped[str] = mapped_column(Text, primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
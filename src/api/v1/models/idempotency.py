@@ -0,0 +1,35 @@
+import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Integer, LargeBinary, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ....config.db import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Response to a create request sent with an Idempotency-Key, replayed to
+    retries of it until `expires_at`. A row without a status code is a
+    request still in flight; `expires_at` is then the end of its lease, renewed
+    by the holder of `token` while it runs.
+    """
+
+    __tablename__ = "idempotency_key"
+
+    # hash of the route, caller and Idempotency-Key header
+    key: Mapped[str] = mapped_column(Text, primary_key=True)
+    # random per claim, so only its holder renews, records or releases it
+    token: Mapped[str] = mapped_column(Text, nullable=False)
+    # hash of the negotiated format and request body, a reused key with
+    # another one is rejected
+    fingerprint: Mapped[str] = mapped_column(Text, nullable=False)
+    status_code: Mapped[Optional[int]] = mapped_column(Integer)
+    media_type: Mapped[Optional[str]] = mapped_column(Text)
+    body: Mapped[Optional[bytes]] = mapped_column(LargeBinary)
+    # [name, value] pairs of the stored response, replayed with it
+    headers: Mapped[Optional[list]] = mapped_column(JSONB)
+    expires_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, index=True
+    )
@@ -0,0 +1,29 @@
+import datetime
+import uuid
+
+from sqlalchemy import UUID, Date, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ....config.db import Base
+
+
+class DepartmentDailyStats(Base):
+    """
+    Appointment counts per department, calendar day and status.
+
+    Maintained incrementally by the transactions that write appointments, so
+    dashboards never aggregate the appointment table themselves.
+    """
+
+    __tablename__ = "department_daily_stats"
+
+    department_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("department.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    day: Mapped[datetime.date] = mapped_column(Date, primary_key=True)
+    booked: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    fulfilled: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    cancelled: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    noshow: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -1,26 +1,60 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-from typing import List, Annotated
+from typing import List, Annotated, Optional
 import logging
 
 from src.api.v1.patient.dto.dto import PatientProfileDto, PatientUpdateDto
-from src.api.v1.response_dto import ResponseDto
-from .patient_service import PatientService
-from src.config.db import get_db
+from src.api.v1.response_dto import PaginatedResponseDto, ResponseDto
+from src.api.v1.utils.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
+from src.api.v1.utils.idempotency import IdempotentRoute
+from .patient_service import DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT, PatientService
+from src.config.db import get_db, get_read_db
 
-router = APIRouter(prefix="/patients", tags=["Patients"])
+router = APIRouter(prefix="/patients", tags=["Patients"], route_class=IdempotentRoute)
 
 
-@router.get("", response_model=ResponseDto, status_code=status.HTTP_200_OK)
-async def list_patients(db: Annotated[AsyncSession, Depends(get_db)]):
-    data = await PatientService.list_patients(db)
+@router.get(
+    "",
+    response_model=PaginatedResponseDto[list[PatientProfileDto]],
+    status_code=status.HTTP_200_OK,
+)
+async def list_patients(
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_LIMIT)] = DEFAULT_PAGE_LIMIT,
+    after: Optional[str] = None,
+):
+    page = await PatientService.list_patients(db, limit, after)
+    return {
+        "data": page.items,
+        "next_cursor": page.next_cursor,
+        "status": status.HTTP_200_OK,
+    }
+
+
+@router.get(
+    "/search",
+    response_model=ResponseDto[list[PatientProfileDto]],
+    status_code=status.HTTP_200_OK,
+)
+async def search_patients(
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    q: Annotated[str, Query(min_length=1, max_length=100)],
+    limit: Annotated[int, Query(ge=1, le=MAX_SEARCH_LIMIT)] = DEFAULT_SEARCH_LIMIT,
+):
+    """
+    Search patients by name, phone or address, with or without diacritics
+    ("Nguyen Van A" finds "Nguyễn Văn A"). Best matches first.
+    """
+    data = await PatientService.search_patients(db, q.strip(), limit)
     return {"data": data, "status": status.HTTP_200_OK}
 
 
-@router.post("", response_model=ResponseDto, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "", response_model=ResponseDto[PatientProfileDto], status_code=status.HTTP_201_CREATED
+)
 async def create_patient(
     db: Annotated[AsyncSession, Depends(get_db)], patient_data: PatientProfileDto
 ):
@@ -28,14 +62,20 @@ async def create_patient(
     return {"data": data, "status": status.HTTP_201_CREATED}
 
 
-@router.get("/{patient_id}", response_model=ResponseDto, status_code=status.HTTP_200_OK)
-async def get_patient(db: Annotated[AsyncSession, Depends(get_db)], patient_id: UUID):
+@router.get(
+    "/{patient_id}",
+    response_model=ResponseDto[PatientProfileDto],
+    status_code=status.HTTP_200_OK,
+)
+async def get_patient(db: Annotated[AsyncSession, Depends(get_read_db)], patient_id: UUID):
     data = await PatientService.get_patient(db, patient_id)
     return {"data": data, "status": status.HTTP_200_OK}
 
 
 @router.patch(
-    "/{patient_id}", response_model=ResponseDto, status_code=status.HTTP_202_ACCEPTED
+    "/{patient_id}",
+    response_model=ResponseDto[PatientUpdateDto],
+    status_code=status.HTTP_202_ACCEPTED,
 )
 async def update_patient(
     db: Annotated[AsyncSession, Depends(get_db)],
@@ -47,7 +87,7 @@ async def update_patient(
 
 
 @router.delete(
-    "/{patient_id}", response_model=ResponseDto, status_code=status.HTTP_202_ACCEPTED
+    "/{patient_id}", response_model=ResponseDto[None], status_code=status.HTTP_202_ACCEPTED
 )
 async def delete_patient(
     db: Annotated[AsyncSession, Depends(get_db)], patient_id: UUID
@@ -1,24 +1,45 @@
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import Float, delete, func, literal, or_, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
+from typing import Optional
 import logging
 
-from src.api.v1.models.auth import PatientProfile
+from src.api.v1.models.auth import (
+    PatientProfile,
+    patient_search_document,
+    search_normalize,
+)
 from src.api.v1.patient.dto.dto import PatientProfileDto, PatientUpdateDto
+from src.api.v1.utils.columns import DtoColumns
+from src.api.v1.utils.pagination import DEFAULT_PAGE_LIMIT, Page, keyset, to_page
+from src.api.v1.utils.search import escape_like
 from src.config.db import get_db
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+PATIENT_COLUMNS = DtoColumns(PatientProfile, PatientProfileDto)
+
 
 class PatientService:
     @staticmethod
-    async def list_patients(db: AsyncSession):
+    async def list_patients(
+        db: AsyncSession, limit: int = DEFAULT_PAGE_LIMIT, after: Optional[str] = None
+    ) -> Page:
         try:
-            result = await db.execute(select(PatientProfile))
-            patients = result.scalars().all()
-            return [PatientProfileDto.model_validate(p) for p in patients]
+            order_by = (PatientProfile.id,)
+            result = await db.execute(
+                keyset(PATIENT_COLUMNS.select(), order_by, limit, after)
+            )
+            page = to_page(result.all(), order_by, limit)
+            return Page(PATIENT_COLUMNS.all(page.items), page.next_cursor)
+
+        except HTTPException:
+            raise
 
         except Exception as e:
             logger.error(f"Error listing patients: {str(e)}", exc_info=True)
@@ -27,13 +48,56 @@ class PatientService:
                 detail="Error retrieving patients",
             )
 
+    @staticmethod
+    async def search_patients(
+        db: AsyncSession, q: str, limit: int = DEFAULT_SEARCH_LIMIT
+    ) -> list[PatientProfileDto]:
+        """
+        Look patients up by name, phone or address, ignoring case and diacritics.
+
+        Matches the query as a substring of the normalized document, or as a
+        close word match for typos, both served by the trigram index. Names
+        starting with the query rank first, then by word similarity.
+        """
+        try:
+            term = search_normalize(literal(q))
+            pattern = search_normalize(literal(escape_like(q)))
+            rank = func.word_similarity(term, patient_search_document, type_=Float)
+            query = (
+                PATIENT_COLUMNS.select()
+                .where(
+                    or_(
+                        patient_search_document.like(
+                            literal("%") + pattern + literal("%"), escape="\\"
+                        ),
+                        term.op("<%")(patient_search_document),
+                    )
+                )
+                .order_by(
+                    search_normalize(PatientProfile.full_name)
+                    .like(pattern + literal("%"), escape="\\")
+                    .desc(),
+                    rank.desc(),
+                    PatientProfile.id,
+                )
+                .limit(limit)
+            )
+            result = await db.execute(query)
+            return PATIENT_COLUMNS.all(result.all())
+
+        except Exception as e:
+            logger.error(f"Error searching patients: {str(e)}", exc_info=True)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error searching patients",
+            )
+
     @staticmethod
     async def create_patient(db: AsyncSession, dto: PatientProfileDto):
         try:
             patient = PatientProfile(**dto.model_dump())
             db.add(patient)
             await db.commit()
-            await db.refresh(patient)
             return PatientProfileDto.model_validate(patient)
 
         except IntegrityError as e:
@@ -55,15 +119,17 @@ class PatientService:
     @staticmethod
     async def get_patient(db: AsyncSession, patient_id: UUID):
         try:
-            result = await db.execute(select(PatientProfile).where(PatientProfile.id == patient_id))
-            patient = result.scalars().first()
+            result = await db.execute(
+                PATIENT_COLUMNS.select().where(PatientProfile.id == patient_id)
+            )
+            row = result.first()
 
-            if not patient:
+            if not row:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND, detail="Patient not found"
                 )
 
-            return PatientProfileDto.model_validate(patient)
+            return PATIENT_COLUMNS.one(row)
 
         except HTTPException:
             raise  # Re-raise handled exceptions
@@ -80,7 +146,13 @@ class PatientService:
         db: AsyncSession, patient_id: UUID, update_data: PatientUpdateDto
     ):
         try:
-            result = await db.execute(select(PatientProfile).where(PatientProfile.id == patient_id))
+            # Apply partial updates in one UPDATE ... RETURNING
+            update_dict = update_data.model_dump(exclude_unset=True)
+            if update_dict:
+                query = update(PatientProfile).values(**update_dict).returning(PatientProfile)
+            else:
+                query = select(PatientProfile)
+            result = await db.execute(query.where(PatientProfile.id == patient_id))
             patient = result.scalars().first()
 
             if not patient:
@@ -88,14 +160,8 @@ class PatientService:
                     status_code=status.HTTP_404_NOT_FOUND, detail="Patient not found"
                 )
 
-            # Apply partial updates
-            update_dict = update_data.model_dump(exclude_unset=True)
-            for key, value in update_dict.items():
-                setattr(patient, key, value)
-
             await db.commit()
-            await db.refresh(patient)
-            return PatientUpdateDto.model_validate(patient)
+            return PatientUpdateDto.model_validate(patient, from_attributes=True)
 
         except IntegrityError as e:
             await db.rollback()
@@ -119,15 +185,17 @@ class PatientService:
     @staticmethod
     async def delete_patient(db: AsyncSession, patient_id: UUID):
         try:
-            result = await db.execute(select(PatientProfile).where(PatientProfile.id == patient_id))
-            patient = result.scalars().first()
+            result = await db.execute(
+                delete(PatientProfile)
+                .where(PatientProfile.id == patient_id)
+                .returning(PatientProfile.id)
+            )
 
-            if not patient:
+            if result.scalar() is None:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND, detail="Patient not found"
                 )
 
-            await db.delete(patient)
             await db.commit()
             return None
 
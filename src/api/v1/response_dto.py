@@ -1,7 +1,19 @@
-from typing import Any
+from typing import Generic, Optional, TypeVar
 from pydantic import BaseModel
 
+T = TypeVar("T")
 
-class ResponseDto(BaseModel):
-    data: Any
+
+class ResponseDto(BaseModel, Generic[T]):
+    """
+    Response envelope. Parametrize it with the payload type, e.g.
+    `ResponseDto[DoctorProfileDto]`, so the route documents and serializes
+    `data` as that type; bare `ResponseDto` leaves it `Any`.
+    """
+
+    data: T
     status: int
+
+
+class PaginatedResponseDto(ResponseDto[T], Generic[T]):
+    next_cursor: Optional[str] = None
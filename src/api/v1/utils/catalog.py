@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import os
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.v1.models.catalog import CatalogVersion
+from src.api.v1.utils.negotiation import msgpack_requested
+from src.config.db import session_manager
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION_REFRESH_SECONDS = float(os.getenv("CATALOG_VERSION_REFRESH_SECONDS", 5))
+CATALOG_CACHE_MAX_AGE = int(os.getenv("CATALOG_CACHE_MAX_AGE", 0))
+
+DEPARTMENT_CATALOG = "department"
+
+
+class CatalogVersions:
+    """
+    In-process copy of the catalog_version table.
+
+    Writers bump the row in their own transaction and publish the new version
+    locally after commit; a background task picks up bumps made by other workers.
+    """
+
+    def __init__(self, refresh_seconds: float = CATALOG_VERSION_REFRESH_SECONDS):
+        self._refresh_seconds = refresh_seconds
+        self._versions: dict[str, int] = {}
+        self._loaded = False
+        self._task: asyncio.Task | None = None
+
+    def get(self, name: str) -> Optional[int]:
+        if not self._loaded:
+            return None
+        return self._versions.get(name, 0)
+
+    def etag(self, name: str) -> Optional[str]:
+        """
+        Strong ETag of the catalog's current version, for the representation
+        negotiated for this request: JSON and MessagePack bodies get distinct tags.
+        """
+        version = self.get(name)
+        if version is None:
+            return None
+        suffix = "-msgpack" if msgpack_requested() else ""
+        return f'"{name}-v{version}{suffix}"'
+
+    def observe(self, name: str, version: int):
+        # versions only grow, never let a slow refresh move one backwards
+        self._versions[name] = max(self._versions.get(name, 0), version)
+
+    @staticmethod
+    async def bump(db: AsyncSession, name: str) -> int:
+        """
+        Increment the catalog version inside the caller's transaction.
+        Call `observe` with the result once the transaction has committed.
+        """
+        result = await db.execute(
+            insert(CatalogVersion)
+            .values(name=name, version=1)
+            .on_conflict_do_update(
+                index_elements=[CatalogVersion.name],
+                set_={"version": CatalogVersion.version + 1},
+            )
+            .returning(CatalogVersion.version)
+        )
+        return result.scalar_one()
+
+    async def refresh(self):
+        async with session_manager.session() as db:
+            result = await db.execute(select(CatalogVersion.name, CatalogVersion.version))
+            for name, version in result.all():
+                self.observe(name, version)
+        self._loaded = True
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Error refreshing catalog versions: {str(e)}")
+            await asyncio.sleep(self._refresh_seconds)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+catalog_versions = CatalogVersions()
+
+
+def cache_headers(etag: str) -> dict[str, str]:
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={CATALOG_CACHE_MAX_AGE}, must-revalidate",
+    }
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Whether the request's If-None-Match validates the given ETag.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
@@ -0,0 +1,40 @@
+from typing import Any, Generic, Iterable, TypeVar
+
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import Select, select
+
+DtoT = TypeVar("DtoT", bound=BaseModel)
+
+
+class DtoColumns(Generic[DtoT]):
+    """
+    Read path that selects exactly the columns behind a DTO's fields and builds
+    the DTOs from plain rows.
+
+    `select(Model)` loads ORM instances (identity map, instance state,
+    instrumented attributes) that read endpoints only copy into a DTO and drop.
+    Selecting the columns skips all of it. Rows are zipped into dicts, which
+    pydantic validates much faster than reading attributes off Row objects.
+    """
+
+    def __init__(self, model: type, dto: type[DtoT]):
+        self.dto = dto
+        self.fields = tuple(dto.model_fields)
+        self.columns = tuple(getattr(model, field) for field in self.fields)
+        self._list = TypeAdapter(list[dto])
+
+    def select(self, *extra: Any) -> Select:
+        """
+        SELECT the DTO columns, in field order, followed by `extra` columns.
+        """
+        return select(*self.columns, *extra)
+
+    def one(self, row: Iterable[Any]) -> DtoT:
+        return self.dto.model_validate(dict(zip(self.fields, row)))
+
+    def all(self, rows: Iterable[Iterable[Any]]) -> list[DtoT]:
+        """
+        Validate the whole result in one call; trailing extra columns are ignored.
+        """
+        fields = self.fields
+        return self._list.validate_python([dict(zip(fields, row)) for row in rows])
@@ -0,0 +1,308 @@
+import asyncio
+import datetime
+import hashlib
+import logging
+import os
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from src.api.v1.models.idempotency import IdempotencyKey
+from src.api.v1.utils.negotiation import (
+    MSGPACK_MEDIA_TYPE,
+    NegotiatedRoute,
+    accepts_msgpack,
+)
+from src.config.db import session_manager
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+# rebuilt from the stored body and media type on replay
+UNSTORED_HEADERS = frozenset({"content-length", "content-type"})
+# how long a stored response is replayed
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", 86400))
+# how long a duplicate waits on the in-flight original; the original renews its
+# claim every third of this, so an expired claim belongs to a crashed worker and
+# is taken over
+IDEMPOTENCY_LEASE_SECONDS = float(os.getenv("IDEMPOTENCY_LEASE_SECONDS", 60))
+IDEMPOTENCY_POLL_SECONDS = float(os.getenv("IDEMPOTENCY_POLL_SECONDS", 0.1))
+IDEMPOTENCY_PURGE_SECONDS = float(os.getenv("IDEMPOTENCY_PURGE_SECONDS", 3600))
+
+
+class IdempotencyStore:
+    """
+    Runs a create request at most once per Idempotency-Key and replays its
+    response to retries, across workers.
+
+    The first request claims the key with a row in its own committed
+    transaction, runs, then stores its response in the row. Duplicates find
+    the claim and wait for the response: on the same worker by awaiting the
+    original, on other workers by polling the row. A failed original (an
+    exception or a 5xx) releases the key so the retry runs for real.
+
+    Each claim carries a token. The original renews its lease while it runs,
+    and records or releases only while the row still holds its token, so a
+    worker that lost its claim never touches the one that took it over.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = IDEMPOTENCY_TTL_SECONDS,
+        lease_seconds: float = IDEMPOTENCY_LEASE_SECONDS,
+        poll_seconds: float = IDEMPOTENCY_POLL_SECONDS,
+        purge_seconds: float = IDEMPOTENCY_PURGE_SECONDS,
+    ):
+        self._ttl = datetime.timedelta(seconds=ttl_seconds)
+        self._lease = datetime.timedelta(seconds=lease_seconds)
+        self._poll_seconds = poll_seconds
+        self._purge_seconds = purge_seconds
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._task: asyncio.Task | None = None
+
+    async def _claim(
+        self, key: str, token: str, fingerprint: str
+    ) -> tuple[bool, Optional[IdempotencyKey]]:
+        """
+        Claim the key, taking over an expired row. Returns whether it was
+        claimed and otherwise the row holding it, None if it was just released.
+        """
+        async with session_manager.session() as db:
+            result = await db.execute(
+                insert(IdempotencyKey)
+                .values(
+                    key=key,
+                    token=token,
+                    fingerprint=fingerprint,
+                    expires_at=func.now() + self._lease,
+                )
+                .on_conflict_do_update(
+                    index_elements=[IdempotencyKey.key],
+                    set_={
+                        "token": token,
+                        "fingerprint": fingerprint,
+                        "status_code": None,
+                        "media_type": None,
+                        "body": None,
+                        "headers": None,
+                        "expires_at": func.now() + self._lease,
+                    },
+                    where=IdempotencyKey.expires_at <= func.now(),
+                )
+                .returning(IdempotencyKey.key)
+            )
+            claimed = result.scalar() is not None
+            await db.commit()
+            if claimed:
+                return True, None
+            result = await db.execute(
+                select(IdempotencyKey).where(IdempotencyKey.key == key)
+            )
+            return False, result.scalars().first()
+
+    async def _renew(self, key: str, token: str) -> bool:
+        async with session_manager.session() as db:
+            result = await db.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.key == key, IdempotencyKey.token == token)
+                .values(expires_at=func.now() + self._lease)
+            )
+            await db.commit()
+        return bool(result.rowcount)
+
+    async def _heartbeat(self, key: str, token: str):
+        interval = self._lease.total_seconds() / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await self._renew(key, token):
+                    logger.warning("Idempotency claim was taken over while in flight")
+                    return
+            except Exception as e:
+                # the next beat retries, the lease covers a couple of misses
+                logger.error(f"Error renewing idempotency key: {str(e)}")
+
+    async def _record(self, key: str, token: str, response: Response):
+        async with session_manager.session() as db:
+            await db.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.key == key, IdempotencyKey.token == token)
+                .values(
+                    status_code=response.status_code,
+                    media_type=response.media_type,
+                    body=bytes(response.body),
+                    headers=[
+                        [name, value]
+                        for name, value in response.headers.items()
+                        if name not in UNSTORED_HEADERS
+                    ],
+                    expires_at=func.now() + self._ttl,
+                )
+            )
+            await db.commit()
+
+    async def _release(self, key: str, token: str):
+        # best effort: a claim that could not be released expires with its lease
+        try:
+            async with session_manager.session() as db:
+                await db.execute(
+                    delete(IdempotencyKey).where(
+                        IdempotencyKey.key == key, IdempotencyKey.token == token
+                    )
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Error releasing idempotency key: {str(e)}")
+
+    async def _execute(
+        self, key: str, token: str, call: Callable[[], Awaitable[Response]]
+    ) -> Response:
+        done = asyncio.get_running_loop().create_future()
+        self._inflight[key] = done
+        heartbeat = asyncio.create_task(self._heartbeat(key, token))
+        try:
+            try:
+                response = await call()
+            except BaseException:
+                heartbeat.cancel()
+                await asyncio.shield(self._release(key, token))
+                raise
+            heartbeat.cancel()
+
+            # streamed bodies can't be replayed, server errors should be retried
+            if response.status_code >= 500 or not hasattr(response, "body"):
+                await self._release(key, token)
+            else:
+                try:
+                    await self._record(key, token, response)
+                except Exception as e:
+                    logger.error(f"Error storing idempotent response: {str(e)}")
+                    await self._release(key, token)
+            return response
+        finally:
+            heartbeat.cancel()
+            del self._inflight[key]
+            done.set_result(None)
+
+    async def run(
+        self, key: str, fingerprint: str, call: Callable[[], Awaitable[Response]]
+    ) -> Response:
+        """
+        Run `call` unless a request with this key already did, in which case
+        its stored response is replayed.
+        """
+        deadline = asyncio.get_running_loop().time() + self._lease.total_seconds()
+        while True:
+            original = self._inflight.get(key)
+            if original is not None:
+                await asyncio.shield(original)
+
+            token = uuid.uuid4().hex
+            claimed, row = await self._claim(key, token, fingerprint)
+            if claimed:
+                return await self._execute(key, token, call)
+            if row is None:
+                continue  # the original failed and released the key, claim again
+            if row.fingerprint != fingerprint:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                    detail=f"{IDEMPOTENCY_KEY_HEADER} was already used for a different request",
+                )
+            if row.status_code is not None:
+                replay = Response(
+                    row.body, status_code=row.status_code, media_type=row.media_type
+                )
+                for name, value in row.headers or ():
+                    replay.headers.append(name, value)
+                replay.headers["Idempotent-Replayed"] = "true"
+                return replay
+            if asyncio.get_running_loop().time() >= deadline:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"A request with this {IDEMPOTENCY_KEY_HEADER} is still in progress",
+                )
+            if key not in self._inflight:
+                await asyncio.sleep(self._poll_seconds)
+
+    async def purge(self):
+        async with session_manager.session() as db:
+            result = await db.execute(
+                delete(IdempotencyKey).where(IdempotencyKey.expires_at <= func.now())
+            )
+            await db.commit()
+        if result.rowcount:
+            logger.info(f"Purged {result.rowcount} expired idempotency keys")
+
+    async def _run(self):
+        while True:
+            try:
+                await self.purge()
+            except Exception as e:
+                logger.error(f"Error purging idempotency keys: {str(e)}")
+            await asyncio.sleep(self._purge_seconds)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+idempotency_store = IdempotencyStore()
+
+
+class IdempotentRoute(NegotiatedRoute):
+    """
+    Route whose POST requests honour an Idempotency-Key header: retries get the
+    first response back instead of running the write again. Keys are scoped to
+    the path and the caller's Authorization header; a retry must send the same
+    body and ask for the same format.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Awaitable[Response]]:
+        handler = super().get_route_handler()
+        if "POST" not in self.methods:
+            return handler
+
+        async def idempotent_handler(request: Request) -> Response:
+            header = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+            if header is None:
+                return await handler(request)
+            if not header or len(header) > IDEMPOTENCY_KEY_MAX_LENGTH:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"{IDEMPOTENCY_KEY_HEADER} must be 1 to "
+                    f"{IDEMPOTENCY_KEY_MAX_LENGTH} characters",
+                )
+
+            scope = "\n".join(
+                (
+                    request.method,
+                    request.url.path,
+                    request.headers.get("authorization", ""),
+                    header,
+                )
+            )
+            key = hashlib.sha256(scope.encode()).hexdigest()
+            # the stored body is in the format first negotiated, a retry asking
+            # for another one is a different request rather than a replay
+            media_type = MSGPACK_MEDIA_TYPE if accepts_msgpack(request) else "application/json"
+            fingerprint = hashlib.sha256(
+                media_type.encode() + b"\n" + await request.body()
+            ).hexdigest()
+            return await idempotency_store.run(
+                key, fingerprint, lambda: handler(request)
+            )
+
+        return idempotent_handler
@@ -0,0 +1,150 @@
+import datetime
+import functools
+import inspect
+import uuid
+from contextvars import ContextVar
+from typing import Any, Callable
+
+import msgpack
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter
+
+from src.api.v1.response_dto import ResponseDto
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+
+# set by the route handler for the endpoint call of a request that asked for msgpack
+_msgpack_requested: ContextVar[bool] = ContextVar("msgpack_requested", default=False)
+
+
+def accepts_msgpack(request: Request) -> bool:
+    """
+    Whether the Accept header lists MessagePack (with a non-zero q).
+    JSON stays the default for anything else, including */*.
+    """
+    for part in request.headers.get("accept", "").split(","):
+        media_type, *params = (p.strip() for p in part.split(";"))
+        if media_type.lower() not in MSGPACK_MEDIA_TYPES:
+            continue
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def msgpack_requested() -> bool:
+    """
+    Whether the endpoint being called will answer in MessagePack.
+    """
+    return _msgpack_requested.get()
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, uuid.UUID):
+        return value.bytes  # 16-byte bin
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        return msgpack.Timestamp.from_datetime(value)  # timestamp extension type
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+    raise TypeError(f"Cannot encode {type(value).__name__} as MessagePack")
+
+
+def packb(value: Any) -> bytes:
+    return msgpack.packb(value, default=_encode)
+
+
+class NegotiatedRoute(APIRoute):
+    """
+    Route that answers `Accept: application/msgpack` with a MessagePack body
+    when its response model is a ResponseDto; other requests get the usual JSON.
+
+    The endpoint is wrapped so its return value is validated against the
+    response model and dumped in python mode, keeping UUIDs and datetimes typed
+    for the encoder instead of round-tripping through JSON strings. Headers and
+    status the endpoint set on its `Response` parameter are carried over.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        response_model = kwargs.get("response_model")
+        if inspect.isclass(response_model) and issubclass(response_model, ResponseDto):
+            self._msgpack_adapter = TypeAdapter(response_model)
+            endpoint = self._negotiate(endpoint)
+        else:
+            self._msgpack_adapter = None
+        super().__init__(path, endpoint, **kwargs)
+
+    def _negotiate(self, endpoint: Callable[..., Any]) -> Callable[..., Any]:
+        signature = inspect.signature(endpoint)
+        # FastAPI injects a single Response per request, reuse the endpoint's own
+        response_param = next(
+            (
+                p.name
+                for p in signature.parameters.values()
+                if inspect.isclass(p.annotation) and issubclass(p.annotation, Response)
+            ),
+            None,
+        )
+        added = response_param is None
+        if added:
+            response_param = "negotiated_response"
+            signature = signature.replace(
+                parameters=[
+                    *signature.parameters.values(),
+                    inspect.Parameter(
+                        response_param,
+                        inspect.Parameter.KEYWORD_ONLY,
+                        annotation=Response,
+                    ),
+                ]
+            )
+
+        @functools.wraps(endpoint)
+        async def negotiated(**kwargs: Any) -> Any:
+            response: Response = kwargs.pop(response_param) if added else kwargs[response_param]
+            content = await endpoint(**kwargs)
+            if not msgpack_requested() or isinstance(content, Response):
+                return content
+
+            value = self._msgpack_adapter.validate_python(content)
+            body = packb(
+                self._msgpack_adapter.dump_python(
+                    value, by_alias=self.response_model_by_alias
+                )
+            )
+            packed = Response(
+                body,
+                status_code=response.status_code or self.status_code or 200,
+                media_type=MSGPACK_MEDIA_TYPE,
+            )
+            packed.headers.raw.extend(response.headers.raw)
+            return packed
+
+        negotiated.__signature__ = signature
+        return negotiated
+
+    def get_route_handler(self) -> Callable[[Request], Any]:
+        handler = super().get_route_handler()
+        if self._msgpack_adapter is None:
+            return handler
+
+        async def negotiated_handler(request: Request) -> Response:
+            token = _msgpack_requested.set(accepts_msgpack(request))
+            try:
+                response = await handler(request)
+            finally:
+                _msgpack_requested.reset(token)
+            response.headers.append("Vary", "Accept")
+            return response
+
+        return negotiated_handler
@@ -0,0 +1,85 @@
+import base64
+import binascii
+import datetime
+import json
+from typing import Any, NamedTuple, Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, tuple_
+
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 500
+
+
+class Page(NamedTuple):
+    items: list
+    next_cursor: Optional[str]
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Opaque, URL-safe cursor for the sort key of the last row of a page.
+    """
+    raw = json.dumps(
+        [v.isoformat() if isinstance(v, datetime.datetime) else str(v) for v in values]
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> list[Any]:
+    """
+    Parse a cursor back into values typed after the sort columns.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(raw, list) or len(raw) != len(columns):
+            raise ValueError("cursor does not match sort key")
+        values = []
+        for column, value in zip(columns, raw):
+            python_type = column.type.python_type
+            if python_type is datetime.datetime:
+                values.append(datetime.datetime.fromisoformat(value))
+            else:
+                values.append(python_type(value))
+        return values
+    except (ValueError, TypeError, binascii.Error) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid cursor: {str(e)}",
+        )
+
+
+def keyset(query: Select, columns: Sequence[Any], limit: int, after: Optional[str]) -> Select:
+    """
+    Restrict a query to the page following `after`, ordered by `columns`.
+
+    Fetches one extra row so `to_page` can tell whether another page exists.
+    The columns must end with a unique column and should be covered by an index.
+    """
+    if after:
+        values = decode_cursor(after, columns)
+        query = query.where(tuple_(*columns) > tuple_(*values))
+    return query.order_by(*columns).limit(limit + 1)
+
+
+def _sort_value(row: Any, column: Any) -> Any:
+    # rows of column selects carry the value under the column key, rows of
+    # entity selects (`select(Model, rank)`) on the entity named after the model
+    if hasattr(row, column.key):
+        return getattr(row, column.key)
+    entity = getattr(column, "class_", None)
+    if entity is not None and hasattr(row, entity.__name__):
+        return getattr(getattr(row, entity.__name__), column.key)
+    raise AttributeError(f"Row has no sort key {column.key!r}")
+
+
+def to_page(rows: Sequence[Any], columns: Sequence[Any], limit: int) -> Page:
+    """
+    Trim the look-ahead row of a `keyset` query and derive the next cursor.
+    """
+    items = list(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor([_sort_value(items[-1], c) for c in columns])
+    return Page(items, next_cursor)
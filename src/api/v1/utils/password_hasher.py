@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from src.config.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# argon2 releases the GIL while hashing, so threads give real parallelism
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 4))
+# jobs allowed to wait for a worker before new ones are shed with 503
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", 64))
+
+T = TypeVar("T")
+
+
+password_hash_duration = registry.histogram(
+    "password_hash_duration_seconds",
+    "Time spent in Argon2 hashing or verification.",
+    ("op",),
+)
+password_hash_queue_wait = registry.histogram(
+    "password_hash_queue_wait_seconds",
+    "Time a hashing job waited for a free worker thread.",
+)
+password_hash_rejected = registry.counter(
+    "password_hash_rejected_total",
+    "Hashing jobs shed with 503 because the queue was full.",
+)
+
+
+class PasswordHasher:
+    """
+    Runs Argon2 hashing and verification on a bounded thread pool so the event
+    loop never blocks on it.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = PASSWORD_HASH_WORKERS,
+        max_queue: int = PASSWORD_HASH_MAX_QUEUE,
+    ):
+        self._context = CryptContext(schemes=["argon2"], deprecated="auto")
+        self._max_workers = max_workers
+        self._max_pending = max_workers + max_queue
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers, thread_name_prefix="password-hash"
+            )
+        return self._executor
+
+    async def _run(self, op: str, fn: Callable[..., T], *args) -> T:
+        if self._pending >= self._max_pending:
+            password_hash_rejected.inc()
+            logger.warning(f"Password hashing queue full ({self._pending}), shedding {op}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry.",
+                headers={"Retry-After": "1"},
+            )
+
+        submitted = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            result = fn(*args)
+            return result, started - submitted, time.perf_counter() - started
+
+        self._pending += 1
+        try:
+            result, wait, duration = await asyncio.get_running_loop().run_in_executor(
+                self._get_executor(), job
+            )
+        finally:
+            self._pending -= 1
+        password_hash_queue_wait.observe(wait)
+        password_hash_duration.observe(duration, op=op)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", self._context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(
+            "verify", self._context.verify, plain_password, hashed_password
+        )
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
+
+registry.gauge(
+    "password_hash_pending",
+    "Hashing jobs running or waiting for a worker thread.",
+    lambda: {(): password_hasher.pending},
+)
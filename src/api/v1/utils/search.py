@@ -0,0 +1,16 @@
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+def escape_like(value: str) -> str:
+    """
+    Escape LIKE wildcards in user input, for patterns using ESCAPE '\\'.
+    """
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def contains(column: InstrumentedAttribute, value: str):
+    """
+    Case-insensitive substring match on the raw column, so a trigram index on it
+    applies (icontains wraps the column in lower() and would not use it).
+    """
+    return column.ilike(f"%{escape_like(value)}%", escape="\\")
@@ -1,36 +1,48 @@
 # file: auth/security.py
+import asyncio
+import logging
+import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Annotated, Optional
 from fastapi import Depends, status, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from passlib.context import CryptContext
 from dotenv import load_dotenv
 import os
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 import jwt
 from jwt import PyJWTError
+from pydantic import ValidationError
 from src.api.v1.auth.dto.auth_dto import TokenDataDto, UserDto
-from src.api.v1.models.auth import User
-from src.config.db import get_db
+from src.api.v1.models.auth import TokenRevocation, User
+from src.api.v1.utils.password_hasher import password_hasher
+from src.config.db import get_db, session_manager
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 SECRET_KEY = os.getenv("SECRET_KEY", "my-secret-key")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+# build the current user from verified token claims instead of a database lookup
+AUTH_TRUST_TOKEN_CLAIMS = os.getenv("AUTH_TRUST_TOKEN_CLAIMS", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+AUTH_DENYLIST_REFRESH_SECONDS = float(os.getenv("AUTH_DENYLIST_REFRESH_SECONDS", 30))
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.verify(plain_password, hashed_password)
 
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+async def get_password_hash(password: str) -> str:
+    return await password_hasher.hash(password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -45,6 +57,61 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+class TokenDenylist:
+    """
+    In-process copy of the token_revocation table, refreshed in the background so
+    checking a token never waits on the database.
+    """
+
+    def __init__(self, refresh_seconds: float = AUTH_DENYLIST_REFRESH_SECONDS):
+        self._refresh_seconds = refresh_seconds
+        self._revoked_at: dict[uuid.UUID, int] = {}
+        self._task: asyncio.Task | None = None
+
+    def is_revoked(self, user_id: uuid.UUID, issued_at: float) -> bool:
+        # `iat` has whole-second precision, so revocations are compared in seconds
+        revoked_at = self._revoked_at.get(user_id)
+        return revoked_at is not None and issued_at < revoked_at
+
+    def revoke(self, user_id: uuid.UUID, revoked_at: datetime):
+        """Apply a revocation on this worker without waiting for the next refresh."""
+        self._revoked_at[user_id] = int(revoked_at.timestamp())
+
+    async def refresh(self):
+        async with session_manager.session() as db:
+            result = await db.execute(
+                select(TokenRevocation.user_id, TokenRevocation.revoked_at)
+            )
+            self._revoked_at = {
+                user_id: int(revoked_at.timestamp())
+                for user_id, revoked_at in result.all()
+            }
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Error refreshing token denylist: {str(e)}")
+            await asyncio.sleep(self._refresh_seconds)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+token_denylist = TokenDenylist()
+
+
 async def get_current_user(
     db: Annotated[AsyncSession, Depends(get_db)],
     token: Annotated[str, Depends(oauth2_scheme)],
@@ -61,10 +128,19 @@ async def get_current_user(
             raise credentials_exception
         token_data = TokenDataDto(username=username)
 
-        user = await db.execute(select(User).where(User.username == username))
-        user = user.scalars().first()
-        if user is None:
+        if AUTH_TRUST_TOKEN_CLAIMS and payload.get("user_id") and payload.get("role"):
+            current_user = UserDto(
+                id=payload["user_id"], username=username, role=payload["role"]
+            )
+        else:
+            user = await db.execute(select(User).where(User.username == username))
+            user = user.scalars().first()
+            if user is None:
+                raise credentials_exception
+            current_user = UserDto(id=user.id, username=user.username, role=user.role)
+
+        if token_denylist.is_revoked(current_user.id, payload.get("iat", 0)):
             raise credentials_exception
-        return UserDto(id=user.id, username=user.username, role=user.role)
-    except PyJWTError:
+        return current_user
+    except (PyJWTError, ValidationError):
         raise credentials_exception
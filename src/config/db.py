@@ -1,5 +1,7 @@
-# TODO: add logging
+import asyncio
+import logging
 import os
+import time
 from typing import AsyncIterator
 from dotenv import load_dotenv
 from sqlalchemy.ext.asyncio import (
@@ -10,11 +12,15 @@ from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncConnection,
 )
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import DeclarativeBase, declarative_base
 import contextlib  # allow context management.
+from .instrumentation import InstrumentedAsyncQueuePool, instrument_engine, pool_status
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
 
 # config
 class Config:
@@ -28,6 +34,24 @@ class Config:
             DB_NAME=os.getenv("DB_NAME", "hospital"),
         ),
     )
+    # full SQL statement logging, for local debugging only
+    DB_ECHO = os.getenv("DB_ECHO", "false").lower() in ("1", "true", "yes")
+
+    # connection pool, tune per deployment: workers * (size + overflow) must fit max_connections
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 20))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))  # seconds to wait for a checkout
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 3600))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+    DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", 5))  # connections opened at startup
+    # asyncpg driver settings
+    DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 100))
+    DB_COMMAND_TIMEOUT = float(os.getenv("DB_COMMAND_TIMEOUT", 60))
+
+    # optional streaming replica for read-only traffic, same pool settings as the primary
+    DB_REPLICA_CONFIG = os.getenv("DB_REPLICA_CONFIG", "")
+    # how long reads stay on the primary after the replica failed
+    DB_REPLICA_RETRY_SECONDS = float(os.getenv("DB_REPLICA_RETRY_SECONDS", 30))
 
 
 config = Config
@@ -45,25 +69,52 @@ class DatabaseSessionManager:
         """
         self._engine: AsyncEngine | None = None  # connection pool manager
         self._sessionmaker: async_sessionmaker | None = None  # factory pattern
+        self._replica_engine: AsyncEngine | None = None
+        self._read_sessionmaker: async_sessionmaker | None = None
+        self._replica_down_until = 0.0  # time.monotonic() deadline, reads use the primary until then
+
+    @staticmethod
+    def _create_engine(host_url: str, name: str) -> AsyncEngine:
+        connect_args = {}
+        if host_url.startswith("postgresql+asyncpg"):
+            connect_args = {
+                "prepared_statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,  # SQLAlchemy's cache
+                "statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,  # asyncpg's own cache
+                "command_timeout": config.DB_COMMAND_TIMEOUT,
+            }
+        engine = create_async_engine(
+            url=host_url,
+            echo=config.DB_ECHO,  # use the python 'logging' module under the hood, print SQL statements
+            poolclass=InstrumentedAsyncQueuePool,  # reports checkout wait time
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+            pool_pre_ping=config.DB_POOL_PRE_PING,
+            pool_recycle=config.DB_POOL_RECYCLE,
+            connect_args=connect_args,
+        )
+        instrument_engine(engine, name)
+        return engine
 
-    def init(self, host_url: str):
+    def init(self, host_url: str, replica_url: str | None = None):
         """
         Actually initializes the database connection and session factory.
 
         Args:
             host_url (str): the database connection URL.
+            replica_url (str | None): optional read replica URL for read-only sessions.
         """
-        self._engine = create_async_engine(
-            url=host_url,
-            echo=True,  # use the python 'logging' module under the hood, print SQL statements
-            pool_size=20,
-            pool_pre_ping=True,
-            pool_recycle=3600,
-        )
+        self._engine = self._create_engine(host_url, "primary")
         self._sessionmaker = async_sessionmaker(
             autocommit=False,
             bind=self._engine,  # optional Engine or Connection. all SQL operations performed by this session will execute via this connectable
+            expire_on_commit=False,  # keep loaded values after commit instead of re-selecting them
         )
+        if replica_url:
+            self._replica_engine = self._create_engine(replica_url, "replica")
+            self._read_sessionmaker = async_sessionmaker(
+                autocommit=False, bind=self._replica_engine, expire_on_commit=False
+            )
 
     async def close(self):
         """
@@ -74,6 +125,71 @@ class DatabaseSessionManager:
         await self._engine.dispose()
         self._engine = None
         self._sessionmaker = None
+        if self._replica_engine is not None:
+            await self._replica_engine.dispose()
+            self._replica_engine = None
+            self._read_sessionmaker = None
+
+    async def warm_up(self, connections: int):
+        """
+        Open connections up front so the first requests don't pay connect latency.
+        At most pool_size connections are kept, overflow ones are closed on return.
+        """
+        if self._engine is None:
+            raise Exception("DatabaseSessionManager is not initialized.")
+
+        async def open_one(engine: AsyncEngine) -> AsyncConnection:
+            conn = await engine.connect()
+            await conn.execute(text("SELECT 1"))
+            return conn
+
+        async def fill(engine: AsyncEngine):
+            count = min(connections, engine.pool.size())
+            if count <= 0:
+                return
+            conns = await asyncio.gather(*(open_one(engine) for _ in range(count)))
+            await asyncio.gather(*(conn.close() for conn in conns))
+
+        await fill(self._engine)
+        if self._replica_engine is not None:
+            try:
+                await fill(self._replica_engine)
+            except (DBAPIError, OSError) as e:
+                # not fatal, reads fall back to the primary
+                logger.warning(f"Could not warm up the replica pool: {e!r}")
+
+    async def ping(self, timeout: float = 2.0):
+        """
+        Round trip to the database; raises if it is unreachable within the timeout.
+        """
+        if self._engine is None:
+            raise Exception("DatabaseSessionManager is not initialized.")
+
+        async def select_one():
+            async with self._engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        await asyncio.wait_for(select_one(), timeout)
+
+    def pool_status(self) -> dict:
+        """
+        Snapshot of the connection pool.
+        """
+        if self._engine is None:
+            raise Exception("DatabaseSessionManager is not initialized.")
+        return pool_status(self._engine.pool)
+
+    def replica_status(self) -> dict | None:
+        """
+        Snapshot of the replica pool and whether reads are currently routed to it,
+        None when no replica is configured.
+        """
+        if self._replica_engine is None:
+            return None
+        return {
+            **pool_status(self._replica_engine.pool),
+            "healthy": time.monotonic() >= self._replica_down_until,
+        }
 
     @contextlib.asynccontextmanager
     async def connect(self) -> AsyncIterator[AsyncConnection]:
@@ -113,6 +229,62 @@ class DatabaseSessionManager:
         finally:
             await session.close()
 
+    async def _begin_read_only(self, session: AsyncSession):
+        # must be the first statement of the transaction; also makes the connection
+        # checkout happen here, so an unreachable replica surfaces right away
+        if session.bind.dialect.name == "postgresql":
+            await session.execute(text("SET TRANSACTION READ ONLY"))
+        else:
+            await session.connection()
+
+    async def _open_read_session(self) -> AsyncSession:
+        if (
+            self._read_sessionmaker is not None
+            and time.monotonic() >= self._replica_down_until
+        ):
+            session = self._read_sessionmaker()
+            try:
+                await self._begin_read_only(session)
+                return session
+            except (DBAPIError, OSError, asyncio.TimeoutError) as e:
+                await session.close()
+                self._replica_down_until = (
+                    time.monotonic() + config.DB_REPLICA_RETRY_SECONDS
+                )
+                logger.warning(
+                    f"Replica unavailable, reading from the primary for "
+                    f"{config.DB_REPLICA_RETRY_SECONDS:.0f}s: {e!r}"
+                )
+
+        session = self._sessionmaker()
+        try:
+            await self._begin_read_only(session)
+        except Exception:
+            await session.close()
+            raise
+        return session
+
+    @contextlib.asynccontextmanager
+    async def read_session(self) -> AsyncIterator[AsyncSession]:
+        """
+        Context manager to create a read-only session on the replica, or on the
+        primary when no replica is configured or it is unhealthy.
+
+        Returns:
+            AsyncIterator[AsyncSession]: An asynchronous iterator that yields a read-only session.
+        """
+        if self._sessionmaker is None:
+            raise Exception("DatabaseSessionManager is not initialized.")
+
+        session = await self._open_read_session()
+        try:
+            yield session
+        except Exception as e:
+            await session.rollback()
+            raise e
+        finally:
+            await session.close()
+
     # for testing
     async def create_all(self, connection: AsyncConnection):
         await connection.run_sync(Base.metadata.create_all)
@@ -127,3 +299,12 @@ session_manager = DatabaseSessionManager()
 async def get_db():
     async with session_manager.session() as session:
         yield session
+
+
+async def get_read_db():
+    """
+    Read-only session for endpoints that never write. Replica data may lag the
+    primary slightly, so anything that must see its own writes uses get_db.
+    """
+    async with session_manager.read_session() as session:
+        yield session
@@ -0,0 +1,200 @@
+"""
+Per-request SQL instrumentation hooked into SQLAlchemy engine and pool events.
+"""
+
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from .metrics import COUNT_BUCKETS, registry
+
+logger = logging.getLogger(__name__)
+
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", 200))
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route.",
+    ("method", "route", "status"),
+)
+db_statement_duration = registry.histogram(
+    "db_statement_duration_seconds", "Duration of individual SQL statements."
+)
+db_queries_per_request = registry.histogram(
+    "db_queries_per_request",
+    "Number of SQL statements executed per HTTP request.",
+    ("route",),
+    buckets=COUNT_BUCKETS,
+)
+db_time_per_request = registry.histogram(
+    "db_time_per_request_seconds",
+    "Total time spent in SQL statements per HTTP request.",
+    ("route",),
+)
+db_pool_checkout_wait = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection.",
+    ("pool",),
+)
+
+
+# instrumented pools by name, read by the pool gauges at scrape time
+_pools: dict[str, AsyncAdaptedQueuePool] = {}
+
+for _metric, _read in (
+    ("db_pool_size", AsyncAdaptedQueuePool.size),
+    ("db_pool_checked_out", AsyncAdaptedQueuePool.checkedout),
+    ("db_pool_checked_in", AsyncAdaptedQueuePool.checkedin),
+    ("db_pool_overflow", AsyncAdaptedQueuePool.overflow),
+):
+    registry.gauge(
+        _metric,
+        f"Connection pool {_metric[len('db_pool_'):].replace('_', ' ')}.",
+        lambda read=_read: {(name,): read(pool) for name, pool in _pools.items()},
+        ("pool",),
+    )
+
+
+class RequestDbStats:
+    __slots__ = ("query_count", "db_time", "slowest_time", "slowest_statement", "pool_wait")
+
+    def __init__(self):
+        self.query_count = 0
+        self.db_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.pool_wait = 0.0
+
+    def record_query(self, statement: str, elapsed: float):
+        self.query_count += 1
+        self.db_time += elapsed
+        if elapsed > self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+
+
+_request_stats: ContextVar[Optional[RequestDbStats]] = ContextVar(
+    "request_db_stats", default=None
+)
+
+
+def current_request_stats() -> Optional[RequestDbStats]:
+    return _request_stats.get()
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that reports how long each checkout waited for a connection."""
+
+    _instrument_name = "primary"
+    checkout_count = 0
+    checkout_wait_total = 0.0
+    checkout_wait_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = time.perf_counter() - start
+            self.checkout_count += 1
+            self.checkout_wait_total += elapsed
+            self.checkout_wait_max = max(self.checkout_wait_max, elapsed)
+            db_pool_checkout_wait.observe(elapsed, pool=self._instrument_name)
+            stats = _request_stats.get()
+            if stats is not None:
+                stats.pool_wait += elapsed
+
+
+def pool_status(pool) -> dict:
+    """
+    Checked-out, idle and overflow connections of a pool plus its checkout wait.
+    """
+    status = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+    }
+    if isinstance(pool, InstrumentedAsyncQueuePool):
+        count = pool.checkout_count
+        status["checkouts"] = count
+        status["checkout_wait_avg_ms"] = (
+            pool.checkout_wait_total / count * 1000 if count else 0.0
+        )
+        status["checkout_wait_max_ms"] = pool.checkout_wait_max * 1000
+    return status
+
+
+def instrument_engine(engine: AsyncEngine, name: str = "primary"):
+    """
+    Attach statement timing listeners and pool gauges to an engine.
+    """
+    sync_engine = engine.sync_engine
+    pool = engine.pool
+    if isinstance(pool, InstrumentedAsyncQueuePool):
+        pool._instrument_name = name
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        db_statement_duration.observe(elapsed)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.record_query(statement, elapsed)
+        if elapsed * 1000 >= DB_SLOW_QUERY_MS:
+            logger.warning(f"Slow query ({elapsed * 1000:.1f} ms): {statement}")
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(context):
+        if context.connection is not None:
+            starts = context.connection.info.get("query_start")
+            if starts:
+                starts.pop()
+
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        _pools[name] = pool
+
+
+async def instrument_request(request: Request, call_next):
+    """
+    HTTP middleware recording route latency and the request's SQL footprint.
+    """
+    stats = RequestDbStats()
+    token = _request_stats.set(stats)
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        elapsed = time.perf_counter() - start
+        _request_stats.reset(token)
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        http_request_duration.observe(
+            elapsed, method=request.method, route=path, status=str(status_code)
+        )
+        db_queries_per_request.observe(stats.query_count, route=path)
+        db_time_per_request.observe(stats.db_time, route=path)
+        logger.debug(
+            f"{request.method} {path} {status_code} {elapsed * 1000:.1f} ms: "
+            f"{stats.query_count} queries, db {stats.db_time * 1000:.1f} ms, "
+            f"pool wait {stats.pool_wait * 1000:.1f} ms, "
+            f"slowest {stats.slowest_time * 1000:.1f} ms {stats.slowest_statement!r}"
+        )
+
+    response.headers["Server-Timing"] = (
+        f"db;dur={stats.db_time * 1000:.1f}, app;dur={elapsed * 1000:.1f}"
+    )
+    return response
@@ -2,10 +2,18 @@ from contextlib import asynccontextmanager
 import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.middleware.base import BaseHTTPMiddleware
 
 # from fastapi.openapi.docs import get_swagger_ui_html
 from .api import api_router
+from .api.health import router as health_router
+from .api.v1.utils.catalog import catalog_versions
+from .api.v1.utils.idempotency import idempotency_store
+from .api.v1.utils.password_hasher import password_hasher
+from .api.v1.utils.security import token_denylist
 from .config.db import config, get_db, session_manager
+from .config.instrumentation import instrument_request
+from .config.metrics import PROMETHEUS_CONTENT_TYPE, registry
 import logging
 from dotenv import load_dotenv
 
@@ -19,7 +27,7 @@ logger = logging.getLogger(__name__)
 def init_app(init_db: bool = True):
     lifespan = None  # type: ignore
     if init_db:
-        session_manager.init(config.DB_CONFIG)
+        session_manager.init(config.DB_CONFIG, config.DB_REPLICA_CONFIG)
 
         @asynccontextmanager
         async def lifespan(app: FastAPI):
@@ -28,10 +36,14 @@ def init_app(init_db: bool = True):
             This is used to manage startup and shutdown events.
             """
             try:
-                session_manager.init(config.DB_CONFIG)
+                session_manager.init(config.DB_CONFIG, config.DB_REPLICA_CONFIG)
                 async with session_manager.connect() as conn:
                     await session_manager.create_all(conn)
+                await session_manager.warm_up(config.DB_POOL_WARMUP)
                 logger.info("Database session manager initialized")
+                token_denylist.start()
+                catalog_versions.start()
+                idempotency_store.start()
             except Exception as e:
                 logger.critical(
                     f"Failed to initialize database session manager: {str(e)}"
@@ -39,6 +51,10 @@ def init_app(init_db: bool = True):
                 raise
             yield
             # add cleanup code when the app shuts down.
+            await token_denylist.stop()
+            await catalog_versions.stop()
+            await idempotency_store.stop()
+            password_hasher.shutdown()
             if session_manager._engine:
                 await session_manager.close()
 
@@ -61,8 +77,10 @@ app.add_middleware(
     allow_headers=headers,
     allow_credentials=True,
 )
+app.add_middleware(BaseHTTPMiddleware, dispatch=instrument_request)
 
 app.include_router(api_router)
+app.include_router(health_router)
 
 favicon_path = "hospital.png"
 
@@ -77,6 +95,17 @@ def favicon():
     return FileResponse(favicon_path)
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Expose application metrics in the Prometheus text format.
+    Rendered on the event loop, the only thread that updates them.
+    """
+    from fastapi.responses import Response
+
+    return Response(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 # @app.get("/docs", include_in_schema=False)
 # def overriden_swagger():
 #     return get_swagger_ui_html(